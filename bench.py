@@ -0,0 +1,156 @@
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+from max_flow import generators, parallel_push_relabel, push_relabel
+from max_flow.CSRGraph import CSRGraph
+from max_flow.CompactPathTree import CompactPathTreeForest
+from max_flow.LinkCutForest import LinkCutForest
+from max_flow.PathTreeRework import PathTreeForest
+from max_flow.generators import Instance, to_matrix
+from max_flow.max_flow import max_flow
+from max_flow.rework import find_max_flow
+
+# Family name -> instance of roughly a given node count for a seed
+FAMILIES: Dict[str, Callable[[int, int], Instance]] = {
+	'random_sparse': lambda size, seed: generators.random_sparse(size, seed=seed),
+	'layered': lambda size, seed: generators.layered(max(2, size // 16), 16, seed=seed),
+	'ak': lambda size, seed: generators.ak(size),
+	'grid': lambda size, seed: generators.grid(int(size ** 0.5), int(size ** 0.5), seed=seed),
+	'bipartite': lambda size, seed: generators.bipartite(size // 2, size // 2, seed=seed),
+	'chain': lambda size, seed: generators.chain(size, seed=seed),
+}
+
+# Solver name -> (whether it needs a dense matrix, solve)
+SOLVERS: Dict[str, Any] = {
+	'rework': (True, lambda I, C: find_max_flow(I[2], I[3], C)),
+	'rework_csr': (False, lambda I, G: find_max_flow(I[2], I[3], G)),
+	'rework_csr_link_cut': (False, lambda I, G: find_max_flow(I[2], I[3], G, LinkCutForest)),
+	'rework_csr_compact': (False, lambda I, G: find_max_flow(I[2], I[3], G, CompactPathTreeForest)),
+	'rework_csr_scaling': (False, lambda I, G: find_max_flow(I[2], I[3], G, LinkCutForest, scaling=True)),
+	'max_flow': (True, lambda I, C: int(max_flow(I[2], I[3], C, sum(sum(row) for row in C)))),
+	'push_relabel': (False, lambda I, G: push_relabel.find_max_flow(I[2], I[3], G)),
+	'push_relabel_parallel': (False, lambda I, G: parallel_push_relabel.find_max_flow(I[2], I[3], G)),
+}
+
+def run(families: List[str], solvers: List[str], sizes: List[int], seed: int, budget: float, dense_limit: int) -> Dict[str, Any]:
+	"""
+	Times every solver on every family and size against a push-relabel
+	reference, skipping a solver on larger sizes once it exceeds budget.
+	"""
+	results = []
+	curves: Dict[str, Dict[str, List[List[float]]]] = {}
+	for family in families:
+		curves[family] = {solver: [] for solver in solvers}
+		over_budget = set()
+		for size in sizes:
+			instance = FAMILIES[family](size, seed)
+			(n, edges, s, t) = instance
+			reference = push_relabel.find_max_flow(s, t, CSRGraph(n, edges))
+			for solver in solvers:
+				(dense, solve) = SOLVERS[solver]
+				if solver in over_budget or (dense and n > dense_limit):
+					continue
+				graph = to_matrix(instance) if dense else CSRGraph(n, edges)
+				start = time.perf_counter()
+				try:
+					flow: Any = solve(instance, graph)
+					error = None
+				except Exception as e:
+					flow = None
+					error = repr(e)
+				seconds = time.perf_counter() - start
+
+				results.append({
+					'family': family,
+					'size': size,
+					'n': n,
+					'm': len(edges),
+					'solver': solver,
+					'seconds': seconds,
+					'flow': flow,
+					'error': error,
+					'correct': flow == reference,
+				})
+				curves[family][solver].append([n, seconds])
+				if seconds > budget:
+					over_budget.add(solver)
+
+	return {
+		'commit': git_commit(),
+		'python': platform.python_version(),
+		'seed': seed,
+		'results': results,
+		'curves': curves,
+	}
+
+# Forest name -> factory, for the dynamic tree micro-benchmark
+FORESTS: Dict[str, Callable[[int], Any]] = {
+	'path_tree': PathTreeForest,
+	'compact_path_tree': CompactPathTreeForest,
+	'link_cut': LinkCutForest,
+}
+
+def run_forests(forests: List[str], n: int, queries: int, seed: int) -> Dict[str, Any]:
+	"""
+	Measures bytes per node and the time to link n nodes into a random tree
+	then splay through random find_root, find_min and add_cost queries.
+	"""
+	rng = random.Random(seed)
+	links = [rng.randrange(u) for u in range(1, n)]
+	picks = [rng.randrange(n) for _ in range(queries)]
+	results = {}
+	for name in forests:
+		make_forest = FORESTS[name]
+		tracemalloc.start()
+		forest = make_forest(n)
+		(size, _) = tracemalloc.get_traced_memory()
+		tracemalloc.stop()
+
+		start = time.perf_counter()
+		for u in range(n - 1, 0, -1):
+			forest.add_cost(u, 1)
+			forest.link(u, links[u - 1])
+		for u in picks:
+			forest.find_root(u)
+			forest.find_min(u)
+			forest.add_cost(u, 0)
+		seconds = time.perf_counter() - start
+
+		results[name] = {'bytes_per_node': size / n, 'seconds': seconds}
+
+	return {'n': n, 'queries': queries, 'seed': seed, 'forests': results}
+
+def git_commit() -> Optional[str]:
+	try:
+		return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+	except (OSError, subprocess.CalledProcessError):
+		return None
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description='Time the max flow engines on generated instance families.')
+	parser.add_argument('--families', nargs='+', default=list(FAMILIES), choices=list(FAMILIES))
+	parser.add_argument('--solvers', nargs='+', default=list(SOLVERS), choices=list(SOLVERS))
+	parser.add_argument('--sizes', nargs='+', type=int, default=[64, 256, 1024, 4096])
+	parser.add_argument('--seed', type=int, default=0)
+	parser.add_argument('--budget', type=float, default=10.0, help='seconds after which a solver skips larger sizes')
+	parser.add_argument('--dense-limit', type=int, default=1500, help='largest n handed to dense solvers')
+	parser.add_argument('--forests', nargs='*', choices=list(FORESTS), help='time only these dynamic trees instead of the solvers')
+	parser.add_argument('--forest-size', type=int, default=100000)
+	parser.add_argument('--out', help='JSON report path, stdout if omitted')
+	args = parser.parse_args()
+
+	if args.forests is not None:
+		report = run_forests(args.forests or list(FORESTS), args.forest_size, args.forest_size, args.seed)
+	else:
+		report = run(args.families, args.solvers, args.sizes, args.seed, args.budget, args.dense_limit)
+	if args.out:
+		with open(args.out, 'w') as out:
+			json.dump(report, out, indent=2)
+	else:
+		json.dump(report, sys.stdout, indent=2)
@@ -0,0 +1,106 @@
+from array import array
+from typing import Iterable, List, Sequence, Tuple
+
+ArcEdge = Tuple[int, int, int]
+
+class CSRGraph:
+	"""
+	Compressed-sparse-row flow network with paired residual arcs.
+
+	Every edge (u, v, c) is stored as a forward arc u -> v with capacity c and
+	a reverse arc v -> u with capacity 0. The arcs leaving u occupy the index
+	range offsets[u]:offsets[u + 1], and pair[a] is the index of the arc
+	opposite to a.
+	"""
+	def __init__(self, n: int, edges: Iterable[Tuple[int, int, int]]):
+		tails = array('q')
+		heads = array('q')
+		capacities: List[int] = []
+		for (u, v, c) in edges:
+			if c and u != v:
+				tails.append(u)
+				heads.append(v)
+				capacities.append(c)
+		self._build(n, tails, heads, capacities)
+
+	@classmethod
+	def from_edge_arrays(cls, n: int, tails: Sequence[int], heads: Sequence[int], capacities: Sequence[int]) -> 'CSRGraph':
+		"""
+		Builds a graph from parallel arrays of edge tails, heads and capacities
+		without going through edge tuples. Every edge must have a nonzero
+		capacity and distinct ends.
+		"""
+		G = cls.__new__(cls)
+		G._build(n, tails, heads, capacities)
+		return G
+
+	def _build(self, n: int, tails: Sequence[int], heads: Sequence[int], capacities: Sequence[int]) -> None:
+		degree = array('q', bytes(8 * (n + 1)))
+		for i in range(len(tails)):
+			degree[tails[i] + 1] += 1
+			degree[heads[i] + 1] += 1
+		for u in range(n):
+			degree[u + 1] += degree[u]
+
+		m = 2 * len(tails)
+		self.n = n
+		self.offsets = degree
+		self.heads = array('q', bytes(8 * m))
+		self.pair = array('q', bytes(8 * m))
+		self.capacity: List[int] = [0] * m
+		self.residual: List[int] = [0] * m
+
+		fill = degree[:n]
+		for i in range(len(tails)):
+			u = tails[i]
+			v = heads[i]
+			a = fill[u]
+			b = fill[v]
+			fill[u] += 1
+			fill[v] += 1
+			self.heads[a] = v
+			self.heads[b] = u
+			self.pair[a] = b
+			self.pair[b] = a
+			self.capacity[a] = capacities[i]
+			self.residual[a] = capacities[i]
+
+	@classmethod
+	def from_matrix(cls, C: List[List[int]]) -> 'CSRGraph':
+		"""Builds a graph from a dense capacity matrix."""
+		n = len(C)
+		return cls(n, ((u, v, c) for u in range(n) for (v, c) in enumerate(C[u]) if c))
+
+	@classmethod
+	def from_arrays(cls, offsets: Sequence[int], heads: Sequence[int], pair: Sequence[int], capacity: Sequence[int]) -> 'CSRGraph':
+		"""
+		Wraps existing arc arrays without copying them.
+
+		Only the residuals are allocated, so read-only buffers such as shared
+		memory views can back the structure of the graph.
+		"""
+		G = cls.__new__(cls)
+		G.n = len(offsets) - 1
+		G.offsets = offsets
+		G.heads = heads
+		G.pair = pair
+		G.capacity = capacity
+		G.residual = list(capacity)
+		return G
+
+	def __len__(self) -> int:
+		return self.n
+
+	def arcs(self, u: int) -> range:
+		"""Indices of the arcs leaving node u."""
+		return range(self.offsets[u], self.offsets[u + 1])
+
+	def flow(self, a: int) -> int:
+		"""Flow along an arc. Negative on reverse arcs carrying flow."""
+		return self.capacity[a] - self.residual[a]
+
+	def update_edge(self, u: int, uv: ArcEdge, d: int) -> None:
+		"""Sets the residual of a level graph edge to d, crediting its pair."""
+		a = uv[2]
+		self.residual[self.pair[a]] += self.residual[a] - d
+		self.residual[a] = d
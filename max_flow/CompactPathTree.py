@@ -0,0 +1,44 @@
+from typing import Optional
+from util.constants import LEFT, RIGHT
+from util.data_structures.CompactBSTNode import CompactBSTNode
+from max_flow.PathTreeRework import PathTreeBase, PathTreeForest
+
+class CompactPathTree(PathTreeBase, CompactBSTNode):
+	"""
+	PathTreeRework.PathTree on CompactBSTNode.
+
+	Dashed children are only known through their own parent reference, whose
+	side is None, so no middle list is kept.
+	"""
+	__slots__ = ('delta_cost', 'delta_min', 'label', 'next_in_path')
+	empty = None
+
+	def __init__(self, label: int):
+		super().__init__()
+		self.delta_cost: int = 0
+		self.delta_min: int = 0
+		self.label = label
+		self.next_in_path: Optional[CompactPathTree] = None
+
+	def adopt_middle(self, child: 'CompactPathTree'):
+		child.parent = self
+
+	def remove_middle(self, child: 'CompactPathTree'):
+		pass
+
+	@property
+	def side(self) -> Optional[bool]:
+		parent = self.parent
+		if parent is None:
+			return None
+		if self is parent.right: return RIGHT
+		if self is parent.left: return LEFT
+		return None
+
+class CompactPathTreeForest(PathTreeForest):
+	"""PathTreeForest over CompactPathTree nodes."""
+	node = CompactPathTree
+
+	def next_in_path(self, u: int) -> Optional[int]:
+		v = self.nodes[u].next_in_path
+		return None if v is None else v.label
@@ -0,0 +1,131 @@
+from typing import Any, Dict, List, Optional, Tuple
+from max_flow.CSRGraph import CSRGraph
+
+Path = Tuple[List[int], int]
+
+class FlowResult:
+	"""
+	Value of a maximum flow together with its per-edge flows.
+
+	Edge flows are held sparsely as parallel tails, heads and flows lists, one
+	entry per edge carrying flow. A dense matrix and a path decomposition are
+	only built when asked for. stats holds SolveStats.as_dict() when the solve
+	was instrumented.
+	"""
+	def __init__(
+			self,
+			s: int,
+			t: int,
+			n: int,
+			value: int,
+			tails: List[int],
+			heads: List[int],
+			flows: List[int],
+			stats: Optional[Dict[str, Any]] = None
+		):
+		self.s = s
+		self.t = t
+		self.n = n
+		self.value = value
+		self.tails = tails
+		self.heads = heads
+		self.flows = flows
+		self.stats = stats
+		self._paths: Optional[List[Path]] = None
+
+	@classmethod
+	def from_graph(cls, s: int, t: int, G: CSRGraph, value: int, stats: Optional[Dict[str, Any]] = None) -> 'FlowResult':
+		"""Collects the flow left in a solved graph's residuals."""
+		tails: List[int] = []
+		heads: List[int] = []
+		flows: List[int] = []
+		for u in range(len(G)):
+			for a in G.arcs(u):
+				if G.capacity[a] and (f := G.flow(a)) > 0:
+					tails.append(u)
+					heads.append(G.heads[a])
+					flows.append(f)
+		return cls(s, t, len(G), value, tails, heads, flows, stats)
+
+	def __int__(self) -> int:
+		return self.value
+
+	def __repr__(self) -> str:
+		return f'FlowResult(value={self.value}, edges={len(self.flows)})'
+
+	def edges(self) -> List[Tuple[int, int, int]]:
+		"""Edges carrying flow as (u, v, flow) triples."""
+		return list(zip(self.tails, self.heads, self.flows))
+
+	def to_numpy(self) -> Tuple[Any, Any, Any]:
+		"""Tails, heads and flows as NumPy arrays."""
+		import numpy as np
+		return (np.asarray(self.tails), np.asarray(self.heads), np.asarray(self.flows))
+
+	def to_dense(self) -> List[List[int]]:
+		"""Builds the full n×n flow matrix."""
+		F = [[0] * self.n for i in range(self.n)]
+		for (u, v, f) in zip(self.tails, self.heads, self.flows):
+			F[u][v] += f
+		return F
+
+	@property
+	def paths(self) -> List[Path]:
+		"""
+		Decomposes the flow into source-to-sink paths with their amounts.
+
+		Computed on first access. Flow circulating on cycles is not part of
+		any path and is left out.
+		"""
+		if self._paths is None:
+			self._paths = self._decompose()
+		return self._paths
+
+	def _decompose(self) -> List[Path]:
+		remaining: List[Dict[int, int]] = [{} for i in range(self.n)]
+		for (u, v, f) in zip(self.tails, self.heads, self.flows):
+			remaining[u][v] = remaining[u].get(v, 0) + f
+
+		paths: List[Path] = []
+		s = self.s
+		t = self.t
+		while len(remaining[s]) > 0:
+			# Walk flow-carrying edges from the source, cancelling any cycle met
+			path = [s]
+			position = {s: 0}
+			u = s
+			while u != t and len(remaining[u]) > 0:
+				v = next(iter(remaining[u]))
+				if v in position:
+					cycle = path[position[v]:] + [v]
+					d = min(remaining[x][y] for (x, y) in zip(cycle, cycle[1:]))
+					for (x, y) in zip(cycle, cycle[1:]):
+						self._reduce(remaining, x, y, d)
+					for x in path[position[v] + 1:]:
+						del position[x]
+					del path[position[v] + 1:]
+					u = v
+					continue
+				position[v] = len(path)
+				path.append(v)
+				u = v
+
+			if u != t:
+				# Dead end: flow into u exceeds flow out, drop the last edge
+				if len(path) > 1:
+					self._reduce(remaining, path[-2], u, remaining[path[-2]][u])
+				continue
+
+			d = min(remaining[x][y] for (x, y) in zip(path, path[1:]))
+			for (x, y) in zip(path, path[1:]):
+				self._reduce(remaining, x, y, d)
+			paths.append((path, d))
+		return paths
+
+	@staticmethod
+	def _reduce(remaining: List[Dict[int, int]], u: int, v: int, d: int) -> None:
+		left = remaining[u][v] - d
+		if left:
+			remaining[u][v] = left
+		else:
+			del remaining[u][v]
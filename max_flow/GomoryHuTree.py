@@ -0,0 +1,129 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple, Union
+from max_flow.CSRGraph import CSRGraph
+from max_flow.PathTreeRework import PathTreeForest
+from max_flow.rework import ForestFactory, find_sparse_max_flow
+
+NONE = -1
+Cut = Tuple[int, Set[int]]
+
+class GomoryHuTree:
+	"""
+	Gomory–Hu cut tree of an undirected network.
+
+	Node u hangs from parent[u] by an edge of weight[u], which is the value of
+	a minimum cut between the two. The minimum cut between any pair of nodes
+	is the lightest edge on the tree path joining them.
+	"""
+	def __init__(self, parent: List[int], weight: List[int]):
+		self.parent = parent
+		self.weight = weight
+		self.depth = [0] * len(parent)
+		for u in range(len(parent)):
+			# Fill in depths along the unvisited stretch of u's root path
+			path = []
+			v = u
+			while v != NONE and (self.depth[v] == 0 and parent[v] != NONE):
+				path.append(v)
+				v = parent[v]
+			d = 0 if v == NONE else self.depth[v]
+			for v in reversed(path):
+				d += 1
+				self.depth[v] = d
+
+	@classmethod
+	def build(
+			cls,
+			C: Union[List[List[int]], CSRGraph],
+			make_forest: ForestFactory = PathTreeForest,
+			processes: Optional[int] = None
+		) -> 'GomoryHuTree':
+		"""
+		Builds the tree with Gusfield's n - 1 maximum flow solves.
+
+		C must be symmetric. With processes set, cuts are solved across a
+		process pool as soon as their pair is final. A later node u's parent p
+		can only change at a step s < u where parent[s] == p, since parents are
+		only ever set to the node being stepped, so once p precedes the current
+		step and no node between the step and u shares it, the pair (u, p) is
+		settled. Only those pairs are submitted, so the pool still runs exactly
+		n - 1 maximum flows, and runs as many at once as the tree built so far
+		has distinct parents of pending nodes.
+		"""
+		n = len(C)
+		if isinstance(C, CSRGraph):
+			edges = [(u, C.heads[a], C.capacity[a]) for u in range(n) for a in C.arcs(u) if C.capacity[a]]
+		else:
+			edges = [(u, v, c) for u in range(n) for (v, c) in enumerate(C[u]) if c]
+
+		parent = [0] * n
+		weight = [0] * n
+		if n > 0:
+			parent[0] = NONE
+		solving: Dict[Tuple[int, int], 'Future[Cut]'] = {}
+		pool = None
+		if processes is not None and n > 2:
+			pool = ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(n, edges, make_forest))
+		else:
+			_init_worker(n, edges, make_forest)
+
+		try:
+			for s in range(1, n):
+				t = parent[s]
+				if pool is None:
+					(value, source_side) = _solve_cut((s, t))
+				else:
+					# Submit the settled pairs, s's own always among them
+					shared: Set[int] = set() # Parents of the nodes from s up to u
+					for u in range(s, n):
+						p = parent[u]
+						if p < s and p not in shared and (u, p) not in solving:
+							solving[(u, p)] = pool.submit(_solve_cut, (u, p))
+						shared.add(p)
+					(value, source_side) = solving.pop((s, t)).result()
+
+				weight[s] = value
+				for u in range(s + 1, n):
+					if parent[u] == t and u in source_side:
+						parent[u] = s
+				if parent[t] != NONE and parent[t] in source_side:
+					parent[s] = parent[t]
+					parent[t] = s
+					weight[s] = weight[t]
+					weight[t] = value
+		finally:
+			if pool is not None:
+				pool.shutdown()
+
+		return cls(parent, weight)
+
+	def min_cut_value(self, u: int, v: int) -> int:
+		"""Value of a minimum u-v cut, read off the tree path in O(n)."""
+		if u == v:
+			raise ValueError('A cut needs two distinct nodes')
+		parent = self.parent
+		weight = self.weight
+		depth = self.depth
+		value = None
+		while u != v:
+			if depth[u] < depth[v]:
+				(u, v) = (v, u)
+			if value is None or weight[u] < value:
+				value = weight[u]
+			u = parent[u]
+		return value
+
+""" WORKER STATE """
+_graph: Optional[Tuple[int, List[Tuple[int, int, int]], ForestFactory]] = None
+
+def _init_worker(n: int, edges: List[Tuple[int, int, int]], make_forest: ForestFactory) -> None:
+	"""Keeps one copy of the edge list per process rather than per task."""
+	global _graph
+	_graph = (n, edges, make_forest)
+
+def _solve_cut(pair: Tuple[int, int]) -> Cut:
+	"""Minimum cut value and source side between a pair of nodes."""
+	(n, edges, make_forest) = _graph
+	(s, t) = pair
+	(value, source_side, cut_edges) = find_sparse_max_flow(s, t, CSRGraph(n, edges), make_forest, cut=True)
+	return (value, source_side)
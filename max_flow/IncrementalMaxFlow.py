@@ -0,0 +1,157 @@
+from collections import deque
+from typing import Deque, Dict, List, Tuple, Union
+from max_flow.CSRGraph import ArcEdge, CSRGraph
+from max_flow.PathTreeRework import PathTreeForest
+from max_flow.rework import ForestFactory, find_sparse_max_flow
+
+class IncrementalMaxFlow:
+	"""
+	Maximum flow solver that keeps its residual state between solves.
+
+	Capacities may be raised, lowered, inserted or deleted between calls to
+	solve. Each update repairs the current flow locally, and solve then
+	augments from that flow instead of starting over from zero. Arcs are kept
+	in growable per-node adjacency lists with the same paired forward/reverse
+	layout as CSRGraph, so the sparse Dinic engine runs on them directly.
+	"""
+	def __init__(
+			self,
+			s: int,
+			t: int,
+			C: Union[List[List[int]], CSRGraph],
+			make_forest: ForestFactory = PathTreeForest
+		):
+		self.s = s
+		self.t = t
+		self.make_forest = make_forest
+		self.n = len(C)
+		self.adjacency: List[List[int]] = [[] for i in range(self.n)]
+		self.heads: List[int] = []
+		self.pair: List[int] = []
+		self.capacity: List[int] = []
+		self.residual: List[int] = []
+		self.index: Dict[Tuple[int, int], int] = {} # Forward arc of each edge
+		self.value = 0
+
+		if isinstance(C, CSRGraph):
+			edges = ((u, C.heads[a], C.capacity[a]) for u in range(self.n) for a in C.arcs(u))
+		else:
+			edges = ((u, v, c) for u in range(self.n) for (v, c) in enumerate(C[u]))
+		for (u, v, c) in edges:
+			if c and u != v:
+				self.set_capacity(u, v, self.get_capacity(u, v) + c)
+
+		self.solve()
+
+	""" GRAPH INTERFACE """
+	def __len__(self) -> int:
+		return self.n
+
+	def arcs(self, u: int) -> List[int]:
+		"""Indices of the arcs leaving node u."""
+		return self.adjacency[u]
+
+	def flow(self, a: int) -> int:
+		"""Flow along an arc. Negative on reverse arcs carrying flow."""
+		return self.capacity[a] - self.residual[a]
+
+	def update_edge(self, u: int, uv: ArcEdge, d: int) -> None:
+		"""Sets the residual of a level graph edge to d, crediting its pair."""
+		a = uv[2]
+		self.residual[self.pair[a]] += self.residual[a] - d
+		self.residual[a] = d
+
+	""" UPDATES """
+	def get_capacity(self, u: int, v: int) -> int:
+		a = self.index.get((u, v))
+		return 0 if a is None else self.capacity[a]
+
+	def set_capacity(self, u: int, v: int, c: int) -> None:
+		"""
+		Sets the capacity of the edge (u, v), inserting it if needed.
+
+		Lowering a capacity below the flow it carries first reroutes the
+		overflow around the edge, then cancels whatever cannot be rerouted
+		back to the source and from the sink.
+		"""
+		if u == v:
+			raise ValueError('Self loops carry no flow')
+		if c < 0:
+			raise ValueError('Capacities must be non-negative')
+
+		a = self.index.get((u, v))
+		if a is None:
+			if not c:
+				return
+			a = len(self.heads)
+			self.heads.extend((v, u))
+			self.pair.extend((a + 1, a))
+			self.capacity.extend((c, 0))
+			self.residual.extend((c, 0))
+			self.adjacency[u].append(a)
+			self.adjacency[v].append(a + 1)
+			self.index[(u, v)] = a
+			return
+
+		f = self.flow(a)
+		self.capacity[a] = c
+		if c >= f:
+			self.residual[a] = c - f
+			return
+
+		# Clamp the flow on (u, v), leaving excess at u and a deficit at v
+		excess = f - c
+		self.residual[a] = 0
+		self.residual[self.pair[a]] = c
+		excess -= self._push(u, v, excess)
+		if excess:
+			if self._push(u, self.s, excess) < excess or self._push(self.t, v, excess) < excess:
+				raise RuntimeError('Flow decomposition lacks a path through the edge')
+			self.value -= excess
+
+	def add_edge(self, u: int, v: int, c: int) -> None:
+		"""Adds capacity c to the edge (u, v), inserting it if needed."""
+		self.set_capacity(u, v, self.get_capacity(u, v) + c)
+
+	def remove_edge(self, u: int, v: int) -> None:
+		"""Deletes the edge (u, v). Its arcs stay behind with no capacity."""
+		self.set_capacity(u, v, 0)
+
+	""" SOLVING """
+	def solve(self) -> int:
+		"""Augments the current flow to a maximum flow and returns its value."""
+		self.value = find_sparse_max_flow(self.s, self.t, self, self.make_forest)
+		return self.value
+
+	def _push(self, u: int, v: int, amount: int) -> int:
+		"""Sends up to amount from u to v along shortest residual paths."""
+		if u == v:
+			return amount
+		sent = 0
+		while sent < amount:
+			via: Dict[int, int] = {u: -1} # Arc used to reach each visited node
+			queue: Deque[int] = deque([u])
+			while len(queue) > 0 and v not in via:
+				x = queue.popleft()
+				for a in self.adjacency[x]:
+					y = self.heads[a]
+					if self.residual[a] and y not in via:
+						via[y] = a
+						queue.append(y)
+			if v not in via:
+				break
+
+			d = amount - sent
+			y = v
+			while y != u:
+				a = via[y]
+				d = min(d, self.residual[a])
+				y = self.heads[self.pair[a]]
+			y = v
+			while y != u:
+				a = via[y]
+				self.residual[a] -= d
+				self.residual[self.pair[a]] += d
+				y = self.heads[self.pair[a]]
+			sent += d
+		return sent
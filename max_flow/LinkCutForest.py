@@ -0,0 +1,231 @@
+from array import array
+from typing import Optional
+
+NONE = -1
+# Costs spread this far apart may not fit the 64-bit cost arrays
+WIDEST = 1 << 62
+
+class LinkCutForest:
+	"""
+	Struct-of-arrays dynamic trees over the node ids 0..n-1.
+
+	Follows the PathTree contract: each node carries the cost of the edge to
+	its next node in the path, solid paths are splay trees ordered from the
+	deepest node on the left to the root of the tree on the right, and costs
+	are stored as delta_cost relative to the splay parent with delta_min
+	holding the node's cost less the minimum cost of its splay subtree.
+
+	The costs are held in 64-bit arrays while they are known to fit. Every
+	stored delta is a cost or the difference of two, and no cost strays
+	further from 0 than the sum of the magnitudes passed to add_cost, so
+	once that sum reaches 2**62 the arrays are traded for lists of Python
+	ints, which cannot overflow.
+	"""
+	def __init__(self, n: int):
+		self.parent = array('q', [NONE]) * n
+		self.left = array('q', [NONE]) * n
+		self.right = array('q', [NONE]) * n
+		self.path_parent = array('q', [NONE]) * n
+		self.next = array('q', [NONE]) * n
+		self.delta_cost = array('q', [0]) * n
+		self.delta_min = array('q', [0]) * n
+		self.spread = 0 # Sum of the magnitudes of all added costs
+
+	def _update(self, x: int) -> None:
+		"""Recomputes delta_min of x from its children."""
+		dc = self.delta_cost
+		dm = self.delta_min
+		m = 0
+		a = self.left[x]
+		if a != NONE and dm[a] - dc[a] > m:
+			m = dm[a] - dc[a]
+		a = self.right[x]
+		if a != NONE and dm[a] - dc[a] > m:
+			m = dm[a] - dc[a]
+		dm[x] = m
+
+	def _rotate(self, x: int) -> None:
+		"""Rotates x above its splay parent."""
+		parent = self.parent
+		left = self.left
+		right = self.right
+		dc = self.delta_cost
+		p = parent[x]
+		g = parent[p]
+		if left[p] == x:
+			b = right[x]
+			left[p] = b
+			right[x] = p
+		else:
+			b = left[x]
+			right[p] = b
+			left[x] = p
+		if b != NONE:
+			parent[b] = p
+			dc[b] += dc[x]
+		parent[p] = x
+		parent[x] = g
+		if g == NONE:
+			path_parent = self.path_parent
+			path_parent[x] = path_parent[p]
+			path_parent[p] = NONE
+		elif left[g] == p:
+			left[g] = x
+		else:
+			right[g] = x
+
+		# Update costs
+		old_delta_cost = dc[x]
+		dc[x] += dc[p]
+		dc[p] = -old_delta_cost
+		self._update(p)
+		self._update(x)
+
+	def _splay(self, x: int) -> None:
+		parent = self.parent
+		left = self.left
+		while (p := parent[x]) != NONE:
+			g = parent[p]
+			if g != NONE:
+				if (left[g] == p) == (left[p] == x):
+					self._rotate(p)
+				else:
+					self._rotate(x)
+			self._rotate(x)
+
+	def _splice(self, y: int, last: int) -> None:
+		"""Trades the deeper part of the splay root y's path for the path ending in last."""
+		parent = self.parent
+		left = self.left
+		path_parent = self.path_parent
+		dc = self.delta_cost
+		a = left[y]
+		if a != NONE:
+			parent[a] = NONE
+			path_parent[a] = y
+			dc[a] += dc[y]
+		if last != NONE:
+			parent[last] = y
+			path_parent[last] = NONE
+			dc[last] -= dc[y]
+		left[y] = last
+		self._update(y)
+
+	def _access(self, x: int) -> int:
+		"""
+		Makes the path from x to its tree root solid, with x at the splay root.
+		Returns the node where x's path joined the previously solid root path.
+		"""
+		path_parent = self.path_parent
+		last = NONE
+		y = x
+		while y != NONE:
+			self._splay(y)
+			self._splice(y, last)
+			last = y
+			y = path_parent[y]
+		self._splay(x)
+		return last
+
+	def next_in_path(self, x: int) -> Optional[int]:
+		v = self.next[x]
+		return None if v == NONE else v
+
+	def find_cost(self, x: int) -> int:
+		self._access(x)
+		return self.delta_cost[x]
+
+	def find_root(self, x: int) -> int:
+		self._access(x)
+		right = self.right
+		while (r := right[x]) != NONE:
+			x = r
+		self._splay(x)
+		return x
+
+	def find_min(self, x: int) -> int:
+		"""Finds the node nearest the root with the minimum cost on x's path."""
+		x = self.find_root(x)
+		left = self.left
+		right = self.right
+		dc = self.delta_cost
+		dm = self.delta_min
+		node = left[x]
+		if node == NONE:
+			return x
+
+		while True:
+			r = right[node]
+			if r != NONE and dc[r] - dm[r] + dm[node] == 0:
+				node = r
+				continue
+
+			if dm[node] > 0:
+				node = left[node]
+				if node == NONE:
+					raise RuntimeError('Invalid cost data')
+				continue
+
+			break
+
+		self._splay(node)
+		return node
+
+	def find_deepest_min(self, x: int) -> int:
+		"""Finds the node nearest x with the minimum cost on x's path."""
+		x = self.find_root(x)
+		left = self.left
+		right = self.right
+		dc = self.delta_cost
+		dm = self.delta_min
+		node = left[x]
+		if node == NONE:
+			return x
+
+		while True:
+			l = left[node]
+			if l != NONE and dc[l] - dm[l] + dm[node] == 0:
+				node = l
+				continue
+
+			if dm[node] > 0:
+				node = right[node]
+				if node == NONE:
+					raise RuntimeError('Invalid cost data')
+				continue
+
+			break
+
+		self._splay(node)
+		return node
+
+	def find_lca(self, x: int, y: int) -> int:
+		"""Finds the deepest node on the paths of both x and y to their tree root."""
+		self._access(x)
+		return self._access(y)
+
+	def add_cost(self, x: int, cost: int) -> None:
+		"""Adds cost to every node on the path from x to its tree root."""
+		self.spread += abs(cost)
+		if self.spread >= WIDEST and isinstance(self.delta_cost, array):
+			self.delta_cost = list(self.delta_cost)
+			self.delta_min = list(self.delta_min)
+		self._access(x)
+		self.delta_cost[x] += cost
+
+	def cut(self, x: int) -> None:
+		"""Removes the edge from x to its next node."""
+		self._access(x)
+		r = self.right[x]
+		if r != NONE:
+			self.right[x] = NONE
+			self.parent[r] = NONE
+			self.delta_cost[r] += self.delta_cost[x]
+			self._update(x)
+		self.next[x] = NONE
+
+	def link(self, x: int, w: int) -> None:
+		"""Makes the tree root x a child of w."""
+		self._access(x)
+		self.path_parent[x] = w
+		self.next[x] = w
@@ -1,5 +1,5 @@
 from max_flow.Edge import Edge
-from typing import List, Optional, Tuple, cast, Any
+from typing import Dict, List, Optional, Tuple, cast, Any
 from weakref import ref
 from max_flow.is_node import is_node
 from util.constants import LEFT, NULL, RIGHT
@@ -22,12 +22,12 @@ class PathTree: # type: Node
 		self.exiting.append(edge)
 		edge.right.entering.append(edge)
 
-	def remove_exiting(self, edge: Edge['PathTree'], flow_graph: List[List[int]], flag) -> List['PathTree']:
+	def remove_exiting(self, edge: Edge['PathTree'], flow_graph: List[Dict[int, int]], flag) -> List['PathTree']:
 		self.exiting.remove(edge)
 		flow_graph[edge.left.label][edge.right.label] = edge.flow
 		return edge.right._remove_entering(edge, flow_graph, flag)
 
-	def _remove_entering(self, edge: Edge['PathTree'], flow_graph: List[List[int]], flag) -> List['PathTree']:
+	def _remove_entering(self, edge: Edge['PathTree'], flow_graph: List[Dict[int, int]], flag) -> List['PathTree']:
 		self.entering.remove(edge)
 		dead_nodes: List['PathTree'] = []
 		if len(self.entering) is 0:
@@ -84,10 +84,12 @@ class PathTree: # type: Node
 
 	@property
 	def cost(self) -> int:
+		# Walks up iteratively, so deep trees cannot exhaust the stack
 		cost = self.delta_cost
 		parent = self.parent
-		if is_node(parent): # Not at the root of a solid sub-tree
-			cost += parent.cost
+		while is_node(parent):
+			cost += parent.delta_cost
+			parent = parent.parent
 
 		return cost
 
@@ -1,5 +1,5 @@
 from max_flow.Edge import Edge
-from typing import List, Optional, Tuple, cast
+from typing import Any, List, Optional, Tuple, Type
 from weakref import ref
 from util.data_structures.is_node import is_node
 from util.constants import LEFT, NULL, RIGHT
@@ -7,21 +7,25 @@ from util.type_guards import is_null
 from util.types import Nullable
 from util.data_structures.BSTNode import BSTNode
 
-class PathTree(BSTNode): # type: Node
-	def __init__(self, label: int):
-		super().__init__()
-		self.delta_cost: int = 0
-		self.delta_min: int = 0
-		self.label = label
-		self.middle: List[PathTree] = []
-		self.next_in_path = NULL
+class PathTreeBase:
+	"""
+	Path tree operations shared by PathTree and CompactPathTree.
+
+	Subclasses provide the binary tree links, side and empty, the value that
+	missing parents and children read as, along with adopt_middle and
+	remove_middle for keeping track of dashed children.
+	"""
+	__slots__ = ()
+	empty: Any = NULL
 
 	@property
 	def cost(self) -> int:
+		# Walks up iteratively, so deep solid sub-trees cannot exhaust the stack
 		cost = self.delta_cost
-		parent = self.parent
-		if is_node(parent): # Not at the root of a solid sub-tree
-			cost += parent.cost
+		node = self
+		while node.side is not None: # Not at the root of a solid sub-tree
+			node = node.parent
+			cost += node.delta_cost
 
 		return cost
 
@@ -29,22 +33,7 @@ class PathTree(BSTNode): # type: Node
 	def min(self):
 		return self.cost - self.delta_min
 
-
-	def adopt_middle(self, child: 'PathTree'):
-		self.middle.append(child)
-		child.parent = self
-
-	@property
-	def side(self) -> Optional[bool]:
-		parent = self.parent
-		if is_null(parent):
-			return
-		right = self is parent.children[RIGHT]
-		if right: return RIGHT
-		left = self is parent.children[LEFT]
-		if left: return LEFT
-
-	def _rotate(self, lookAhead: Optional[Tuple[Nullable['PathTree'], bool]] = None) -> Optional[Tuple[Nullable['PathTree'], bool]]:
+	def _rotate(self, lookAhead: Optional[Tuple[Any, bool]] = None) -> Optional[Tuple[Any, bool]]:
 		if lookAhead:
 			(parent, side) = lookAhead
 		else:
@@ -55,7 +44,8 @@ class PathTree(BSTNode): # type: Node
 			# self is middle child of parent or root
 			return
 
-		if is_node(parent):
+		empty = self.empty
+		if parent is not empty:
 			# Handle single rotation with parent
 			side_0 = not side
 			a = self.children[side]
@@ -70,59 +60,68 @@ class PathTree(BSTNode): # type: Node
 			self.delta_cost += parent.delta_cost
 			parent.delta_cost = - old_delta_cost
 			b_diff = 0
-			if is_node(b):
+			if b is not empty:
 				b.delta_cost += old_delta_cost
 				b_diff = b.delta_min - b.delta_cost
-			c_diff = c.delta_min - c.delta_cost if is_node(c) else 0
-			a_diff = a.delta_min - a.delta_cost if is_node(a) else 0
+			c_diff = c.delta_min - c.delta_cost if c is not empty else 0
+			a_diff = a.delta_min - a.delta_cost if a is not empty else 0
 			p_diff = parent.delta_min - parent.delta_cost
 			parent.delta_min = max(0, b_diff, c_diff)
 			self.delta_min = max(0, a_diff, p_diff)
 
 			# Handle new self parent (i.e. previous grand parent)
 			result = None
-			if is_node(grand_parent):
+			if grand_parent is not empty:
 				if grand_side is not None:
 					# grand parent in same solid sub-tree
 					grand_parent.swap(grand_side, self) # Detaches parent from grand_parent
 					result = (grand_parent, grand_side)
 				else:
 					# parent was, and now self is, middle node
-					grand_parent.middle.remove(parent)
+					grand_parent.remove_middle(parent)
 					grand_parent.adopt_middle(self)
 
 			self.swap(side_0, parent)
 			return result
 
-	def _splice(self) -> Optional['PathTree']:
+	def _splice(self) -> Optional['PathTreeBase']:
 		if self.side is not None:
 			return
 
 		parent = self.parent
-		if is_node(parent):
-			parent.middle.remove(self)
+		empty = self.empty
+		if parent is not empty:
+			parent.remove_middle(self)
 			u = parent.swap(LEFT, self)
-			if is_node(u):
+			if u is not empty:
 				parent.adopt_middle(u)
 				u.delta_cost += parent.delta_cost
 			self.delta_cost -= parent.delta_cost
 			ur = parent.right
-			ur_diff = ur.delta_min - ur.delta_cost if is_node(ur) else 0
+			ur_diff = ur.delta_min - ur.delta_cost if ur is not empty else 0
 			s_diff = self.delta_min - self.delta_cost
 			parent.delta_min = max(0, s_diff, ur_diff)
 			return parent
 
-	def _solid_splay(self) -> Optional['PathTree']:
-		lookAhead = self._rotate()
-		while (lookAhead := self._rotate(lookAhead)):
-			pass
+	def _solid_splay(self) -> Optional['PathTreeBase']:
+		# Zig-zig steps rotate the parent first, keeping long paths from
+		# degrading into a spine that every later splay walks in full
+		while (side := self.side) is not None:
+			parent = self.parent
+			grand_side = parent.side
+			if grand_side is not None:
+				if grand_side == side:
+					parent._rotate((parent.parent, grand_side))
+				else:
+					self._rotate((parent, side))
+			self._rotate()
 		parent = self.parent
-		if is_node(parent):
+		if parent is not self.empty:
 			return parent
 
-	def _splay(self) -> 'PathTree':
+	def _splay(self) -> Any:
 		# Quick exit when root
-		if is_null(self.parent):
+		if self.parent is self.empty:
 			return self
 
 		# 1st Pass – Splay the solid sub-trees up to root
@@ -131,7 +130,7 @@ class PathTree(BSTNode): # type: Node
 			pass
 
 		# 2nd Pass – Splice the dashed edges up to root
-		if is_null(self.parent):
+		if self.parent is self.empty:
 			return self
 		node = self
 		while (node := node._splice()):
@@ -141,37 +140,39 @@ class PathTree(BSTNode): # type: Node
 		self._solid_splay()
 		return self
 
-	def cut_next(self) -> Tuple[Nullable['PathTree'], int]:
+	def cut_next(self) -> Tuple[Any, int]:
 		d = self.find_cost()
 		r = self.cut()
-		if is_node(r):
+		if r is not self.empty:
 			return (r.find_stem(), d)
-		return (NULL, d)
+		return (self.empty, d)
 
 	def find_cost(self) -> int:
 		return self._splay().cost
 
-	def find_root(self) -> 'PathTree':
+	def find_root(self) -> Any:
+		empty = self.empty
 		node = self._splay()
 		right = node.right
-		while is_node(right):
+		while right is not empty:
 			node = right
 			right = node.right
 		return node._splay()
 
-	def find_stem(self) -> 'PathTree':
+	def find_stem(self) -> Any:
+		empty = self.empty
 		node = self._splay()
 		left = node.left
-		while is_node(left):
+		while left is not empty:
 			node = left
 			left = node.left
 		return node._splay()
 
-	def find_min(self) -> 'PathTree':
-		# node = self._splay()
+	def find_min(self) -> Any:
+		empty = self.empty
 		node = self.find_root()
 		left = node.left
-		if is_node(left):
+		if left is not empty:
 			node = left
 		else:
 			return node
@@ -185,14 +186,14 @@ class PathTree(BSTNode): # type: Node
 		while True:
 			right = node.right
 			left = node.left
-			if is_node(right):
+			if right is not empty:
 				r_diff = right.delta_cost - right.delta_min + node.delta_min
-				if (r_diff == 0) is True:
-					node = cast('PathTree', right)
+				if r_diff == 0:
+					node = right
 					continue
 
 			if node.delta_min > 0:
-				if is_node(left):
+				if left is not empty:
 					node = left
 					continue
 				else:
@@ -202,25 +203,79 @@ class PathTree(BSTNode): # type: Node
 
 		return node._splay()
 
-	def add_cost(self, cost: int) -> 'PathTree':
+	def add_cost(self, cost: int) -> Any:
 		self._splay()
 		self.delta_cost += cost
 		left = self.left
-		if is_node(left):
+		if left is not self.empty:
 			left.delta_cost -= cost
 		return self
 
-	def cut(self) -> Nullable['PathTree']:
+	def cut(self) -> Any:
 		right = self._splay().give(RIGHT)
-		self.next_in_path = NULL
-		if is_node(right):
+		self.next_in_path = self.empty
+		if right is not self.empty:
 			right.delta_cost += self.delta_cost
 		return right
 
-	def link(self, other: 'PathTree'):
-		# pass
+	def link(self, other: Any):
 		self._splay()
 		other._splay()
-		other.middle.append(self)
-		self.parent = other
+		other.adopt_middle(self)
 		self.next_in_path = other
+
+class PathTree(PathTreeBase, BSTNode): # type: Node
+	def __init__(self, label: int):
+		super().__init__()
+		self.delta_cost: int = 0
+		self.delta_min: int = 0
+		self.label = label
+		self.middle: List[PathTree] = []
+		self.next_in_path = NULL
+
+	def adopt_middle(self, child: 'PathTree'):
+		self.middle.append(child)
+		child.parent = self
+
+	def remove_middle(self, child: 'PathTree'):
+		self.middle.remove(child)
+
+	@property
+	def side(self) -> Optional[bool]:
+		parent = self.parent
+		if is_null(parent):
+			return
+		right = self is parent.children[RIGHT]
+		if right: return RIGHT
+		left = self is parent.children[LEFT]
+		if left: return LEFT
+
+class PathTreeForest:
+	"""Node-id interface over PathTree nodes, matching LinkCutForest."""
+	node: Type[PathTree] = PathTree
+
+	def __init__(self, n: int):
+		node = self.node
+		self.nodes = [node(i) for i in range(n)]
+
+	def next_in_path(self, u: int) -> Optional[int]:
+		v = self.nodes[u].next_in_path
+		return v.label if is_node(v) else None
+
+	def find_cost(self, u: int) -> int:
+		return self.nodes[u].find_cost()
+
+	def find_root(self, u: int) -> int:
+		return self.nodes[u].find_root().label
+
+	def find_min(self, u: int) -> int:
+		return self.nodes[u].find_min().label
+
+	def add_cost(self, u: int, cost: int) -> None:
+		self.nodes[u].add_cost(cost)
+
+	def cut(self, u: int) -> None:
+		self.nodes[u].cut()
+
+	def link(self, u: int, w: int) -> None:
+		self.nodes[u].link(self.nodes[w])
@@ -0,0 +1,104 @@
+from typing import Dict, List, Sequence, Tuple, Union
+from max_flow.CSRGraph import CSRGraph
+
+class TerminalOverlay(CSRGraph):
+	"""
+	Multi-source, multi-sink view of a CSR graph.
+
+	A virtual super-source n gains an arc to every source and a virtual
+	super-sink n + 1 an arc from every sink. Rather than copying the graph,
+	the virtual arcs are appended to the end of its own arc arrays, so the
+	overlay shares and solves in the graph's residuals until detach drops
+	them again. A virtual arc's capacity is the total capacity leaving its
+	source or entering its sink, which never limits the flow. The graph's arc
+	arrays must be able to grow, so graphs wrapping fixed buffers through
+	CSRGraph.from_arrays cannot be overlaid.
+	"""
+	def __init__(self, G: CSRGraph, sources: Sequence[int], sinks: Sequence[int]):
+		n = len(G)
+		self.graph = G
+		self.n = n + 2
+		self.s = n
+		self.t = n + 1
+		self.sources = list(dict.fromkeys(sources))
+		self.sinks = list(dict.fromkeys(sinks))
+		self.offsets = G.offsets
+		self.heads = heads = G.heads
+		self.pair = pair = G.pair
+		self.capacity = capacity = G.capacity
+		self.residual = residual = G.residual
+		self.m = m = len(heads)
+		self.virtual: Dict[int, List[int]] = {} # Virtual arcs leaving each terminal
+
+		def add_arc(u: int, v: int, c: int) -> int:
+			a = len(heads)
+			heads.append(v)
+			heads.append(u)
+			pair.append(a + 1)
+			pair.append(a)
+			capacity.append(c)
+			capacity.append(0)
+			residual.append(c)
+			residual.append(0)
+			return a
+
+		for u in self.sources:
+			a = add_arc(n, u, sum((capacity[a] for a in G.arcs(u))))
+			self.virtual.setdefault(u, []).append(a + 1)
+		for v in self.sinks:
+			a = add_arc(v, n + 1, sum((capacity[pair[a]] for a in G.arcs(v))))
+			self.virtual.setdefault(v, []).append(a)
+
+		k = m + 2 * len(self.sources)
+		self.source_arcs = range(m, k, 2)
+		self.sink_arcs = range(k + 1, len(heads), 2)
+
+	def arcs(self, u: int) -> Sequence[int]:
+		"""Indices of the arcs leaving node u, virtual ones included."""
+		if u >= self.s:
+			return self.source_arcs if u == self.s else self.sink_arcs
+		arcs = range(self.offsets[u], self.offsets[u + 1])
+		virtual = self.virtual.get(u)
+		return arcs if virtual is None else [*arcs, *virtual]
+
+	def rebalance(self) -> None:
+		"""
+		Sets the flow on every virtual arc to its terminal's net flow along the
+		graph's own arcs, for solvers that only solved the underlying graph.
+		"""
+		G = self.graph
+		R = self.residual
+		for a in self.source_arcs:
+			f = sum((G.flow(b) for b in G.arcs(self.heads[a])))
+			R[a] = self.capacity[a] - f
+			R[a + 1] = f
+		for a in self.sink_arcs:
+			f = -sum((G.flow(b) for b in G.arcs(self.heads[a])))
+			R[a - 1] = self.capacity[a - 1] - f
+			R[a] = f
+
+	def detach(self) -> CSRGraph:
+		"""Drops the virtual arcs, leaving the flow on the graph's own arcs."""
+		m = self.m
+		del self.heads[m:]
+		del self.pair[m:]
+		del self.capacity[m:]
+		del self.residual[m:]
+		self.virtual.clear()
+		self.source_arcs = self.sink_arcs = range(m, m)
+		return self.graph
+
+def overlay_flow_graph(s: List[int], t: List[int], C: Union[List[List[int]], CSRGraph]) -> Tuple[int, int, Union[List[List[int]], CSRGraph]]:
+	"""
+	Copy-free counterpart of normalize_flow_graph.
+
+	Single terminals are returned as they are along with C. Otherwise C, read
+	into a CSRGraph when dense, is wrapped in a TerminalOverlay whose virtual
+	terminals are returned.
+	"""
+	if len(s) == 1 and len(t) == 1:
+		return (s[0], t[0], C)
+
+	G = C if isinstance(C, CSRGraph) else CSRGraph.from_matrix(C)
+	overlay = TerminalOverlay(G, s, t)
+	return (overlay.s, overlay.t, overlay)
@@ -1,8 +1,31 @@
 # from max_flow.max_flow import max_flow
-from max_flow.rework import find_max_flow
+from max_flow.rework import find_max_flow, iterate_max_flow
 from random import randrange
 from max_flow.third_party_code.verified import verified_solution
 from max_flow.normalize_flow_graph import normalize_flow_graph
+from max_flow.TerminalOverlay import overlay_flow_graph
+from max_flow.CSRGraph import CSRGraph
+from max_flow.LinkCutForest import LinkCutForest
+from max_flow.CompactPathTree import CompactPathTreeForest
+from max_flow import push_relabel
+from max_flow import parallel_push_relabel
+from max_flow.IncrementalMaxFlow import IncrementalMaxFlow
+from max_flow.FlowResult import FlowResult
+from max_flow.GomoryHuTree import GomoryHuTree
+from max_flow.solve_many import solve_many
+from max_flow import vectorized
+from max_flow.dimacs import parse_dimacs, write_dimacs_flow
+from max_flow.instrumentation import SolveStats
+from max_flow.PathTreeRework import PathTreeForest
+from max_flow.generators import chain, grid
+from max_flow.unit_capacity import find_unit_max_flow
+from max_flow.reduction import reduce_flow_graph
+from max_flow.min_cost_flow import find_min_cost_flow
+from max_flow.cache import FlowCache
+from max_flow.memory_mapped import MappedGraph, find_mapped_max_flow
+import io
+import os
+import tempfile
 import time
 
 caps = [[0, 2], [0, 0]]
@@ -40,6 +63,18 @@ flow = find_max_flow(s, t, C)
 correct = 4
 print(f"    Result is {flow} – expected {correct} – {'✅' if flow == correct else '❌'}")
 
+# The 2**63 capacity keeps the matrix in Python ints
+caps = [[0, 1, 1, 0, 0, 0    ],
+		[0, 0, 0, 0, 1, 0    ],
+		[0, 0, 0, 1, 1, 0    ],
+		[0, 0, 0, 0, 0, 1    ],
+		[0, 0, 0, 0, 0, 1    ],
+		[0, 0, 0, 0, 2**63, 0]]
+print("  Test cancelling flow on a saturated antiparallel edge:")
+flow = find_max_flow(0, 5, caps)
+correct = 2
+print(f"    Result is {flow} – expected {correct} – {'✅' if flow == correct else '❌'}")
+
 caps = [[0, 0, 4, 6, 0, 0],
 		[0, 0, 5, 2, 0, 0],
 		[0, 0, 0, 0, 4, 4],
@@ -54,6 +89,253 @@ flow = find_max_flow(s, t, C)
 correct = 16
 print(f"    Result is {flow} – expected {correct} – {'✅' if flow == correct else '❌'}")
 
+print("  Test copy-free multi-terminal overlay:")
+result = []
+for solve in (find_max_flow, push_relabel.find_max_flow, lambda s, t, O: parallel_push_relabel.find_max_flow(s, t, O, processes=2)):
+	G = CSRGraph.from_matrix(caps)
+	arcs = len(G.heads)
+	(s, t, O) = overlay_flow_graph(sources, sinks, G)
+	result.append((solve(s, t, O), len(O.detach().heads) == arcs))
+correct = [(16, True), (16, True), (16, True)]
+print(f"    Result is {result} – expected {correct} – {'✅' if result == correct else '❌'}")
+
+print("  Test parallel push-relabel rounds:")
+(n, edges, s, t) = grid(8, 8)
+result = [
+	parallel_push_relabel.find_parallel_max_flow(CSRGraph.from_matrix(caps), sources, sinks, 2),
+	parallel_push_relabel.find_parallel_max_flow(CSRGraph(n, edges), [s], [t], 3)
+]
+correct = [16, push_relabel.find_max_flow(s, t, CSRGraph(n, edges))]
+print(f"    Result is {result} – expected {correct} – {'✅' if result == correct else '❌'}")
+
+caps = [[0, 3, 0, 0],
+		[0, 0, 2, 4],
+		[0, 0, 0, 3],
+		[0, 0, 0, 0]]
+edges = [(u, v, c) for u in range(4) for v in range(4) if (c := caps[u][v])]
+print("  Test sparse CSR graph:")
+flow = find_max_flow(0, 3, CSRGraph(4, edges))
+correct = 3
+print(f"    Result is {flow} – expected {correct} – {'✅' if flow == correct else '❌'}")
+
+caps = [[0, 4, 4, 0],
+		[0, 0, 3, 2],
+		[0, 1, 0, 5],
+		[0, 0, 0, 0]]
+print("  Test array-backed link-cut forest:")
+flow = find_max_flow(0, 3, caps, LinkCutForest)
+correct = 7
+print(f"    Result is {flow} – expected {correct} – {'✅' if flow == correct else '❌'}")
+
+print("  Test link-cut forest costs beyond 64 bits:")
+flow = find_max_flow(0, 3, [[c << 62 for c in row] for row in caps], LinkCutForest)
+correct = 7 << 62
+print(f"    Result is {flow} – expected {correct} – {'✅' if flow == correct else '❌'}")
+
+print("  Test slotted compact path trees:")
+flow = find_max_flow(0, 3, CSRGraph.from_matrix(caps), CompactPathTreeForest)
+correct = 7
+print(f"    Result is {flow} – expected {correct} – {'✅' if flow == correct else '❌'}")
+
+caps = [[0, 7, 0, 0],
+		[0, 0, 6, 0],
+		[0, 0, 0, 8],
+		[0, 0, 0, 0]]
+G = CSRGraph.from_matrix(caps)
+print("  Test flow result edges and path decomposition:")
+result = FlowResult.from_graph(0, 3, G, find_max_flow(0, 3, G))
+correct = ([(0, 1, 6), (1, 2, 6), (2, 3, 6)], [([0, 1, 2, 3], 6)])
+print(f"    Result is {(result.edges(), result.paths)} – expected {correct} – {'✅' if (result.edges(), result.paths) == correct else '❌'}")
+
+caps = [[0, 3, 3, 0, 0, 0],
+		[0, 0, 2, 3, 0, 0],
+		[0, 0, 0, 0, 2, 0],
+		[0, 0, 0, 0, 4, 2],
+		[0, 0, 0, 0, 0, 2],
+		[0, 0, 0, 0, 0, 0]]
+print("  Test minimum cut extraction:")
+(flow, source_side, cut_edges) = find_max_flow(0, 5, caps, cut=True)
+correct = (4, {0, 1, 2, 3, 4}, [(3, 5), (4, 5)])
+result = (flow, source_side, sorted(cut_edges))
+print(f"    Result is {result} – expected {correct} – {'✅' if result == correct else '❌'}")
+
+print("  Test incremental re-solve after capacity updates:")
+solver = IncrementalMaxFlow(0, 5, caps)
+solver.set_capacity(3, 5, 1)
+solver.add_edge(2, 5, 3)
+solver.remove_edge(4, 5)
+flow = solver.solve()
+correct = 4
+print(f"    Result is {flow} – expected {correct} – {'✅' if flow == correct else '❌'}")
+
+caps = [[0, 0, 2, 3, 0, 1],
+		[0, 0, 0, 0, 0, 0],
+		[0, 0, 0, 0, 0, 2],
+		[0, 0, 0, 0, 3, 0],
+		[0, 0, 0, 0, 0, 3],
+		[0, 0, 0, 0, 0, 0]]
+print("  Test phase-by-phase iteration with early stop:")
+result = (list(iterate_max_flow(0, 5, caps)), list(iterate_max_flow(0, 5, caps, stop_at=3)), find_max_flow(0, 5, caps, stop_at=3))
+correct = ([(1, 1), (3, 2), (6, 3)], [(1, 1), (3, 2)], 3)
+print(f"    Result is {result} – expected {correct} – {'✅' if result == correct else '❌'}")
+
+caps = [[0, 1, 1, 1, 0, 0, 0, 0],
+		[0, 0, 0, 0, 1, 1, 0, 0],
+		[0, 0, 0, 0, 1, 0, 0, 0],
+		[0, 0, 0, 0, 1, 0, 0, 0],
+		[0, 0, 0, 0, 0, 0, 0, 1],
+		[0, 0, 0, 0, 0, 0, 0, 1],
+		[0, 0, 0, 0, 0, 0, 0, 1],
+		[0, 0, 0, 0, 0, 0, 0, 0]]
+print("  Test unit capacity bipartite matching:")
+result = find_unit_max_flow(0, 7, caps)
+correct = (2, [(1, 5), (2, 4)])
+print(f"    Result is {result} – expected {correct} – {'✅' if result == correct else '❌'}")
+
+print("  Test unit capacity terminal overlays:")
+result = []
+for (caps, sources, sinks) in (
+		([[0, 0, 1, 1, 0], [0, 0, 0, 1, 1], [0, 0, 0, 1, 0], [0, 0, 0, 0, 0], [0, 0, 0, 0, 0]], [3, 2], [1, 4]),
+		([[0, 0, 1, 0, 0, 0], [0, 0, 0, 1, 0, 0], [0, 0, 0, 1, 1, 0], [0, 0, 0, 0, 0, 1], [0, 0, 0, 0, 0, 0], [0, 0, 0, 0, 0, 0]], [0, 1], [4, 5])
+	):
+	(s, t, O) = overlay_flow_graph(sources, sinks, caps)
+	result.append(find_max_flow(s, t, O))
+correct = [0, 2]
+print(f"    Result is {result} – expected {correct} – {'✅' if result == correct else '❌'}")
+
+edges = [(0, 1, 5), (0, 1, 2), (1, 2, 4), (2, 3, 9), (0, 3, 1), (0, 4, 3), (4, 0, 1)]
+print("  Test graph reduction before solving:")
+reduction = reduce_flow_graph(0, 3, CSRGraph(5, edges))
+cut = find_max_flow(reduction.s, reduction.t, reduction.graph, cut=True)
+(flow, source_side, cut_edges) = reduction.lift_cut(cut)
+result = (len(reduction.graph), reduction.lift_flow(reduction.graph).value, source_side, cut_edges)
+correct = (2, 5, {0, 1, 4}, [(0, 3), (1, 2)])
+print(f"    Result is {result} – expected {correct} – {'✅' if result == correct else '❌'}")
+
+caps = [[0, 3, 2, 0],
+		[0, 0, 1, 2],
+		[0, 0, 0, 2],
+		[0, 0, 0, 0]]
+costs = [[0, 1, 2, 0],
+		[0, 0, 0, 3],
+		[0, 0, 0, 1],
+		[0, 0, 0, 0]]
+print("  Test min-cost flow by network simplex:")
+result = find_min_cost_flow(0, 3, caps, costs)
+correct = (4, 13, [[0, 3, 1, 0], [0, 0, 1, 2], [0, 0, 0, 2], [0, 0, 0, 0]])
+print(f"    Result is {result} – expected {correct} – {'✅' if result == correct else '❌'}")
+
+caps = [[0, 1, 7, 0],
+		[1, 0, 1, 3],
+		[7, 1, 0, 2],
+		[0, 3, 2, 0]]
+print("  Test Gomory–Hu tree all-pairs minimum cuts:")
+tree = GomoryHuTree.build(caps)
+result = [tree.min_cut_value(u, v) for u in range(4) for v in range(4) if u != v]
+correct = [verified_solution(u, v, caps) for u in range(4) for v in range(4) if u != v]
+print(f"    Result is {result} – expected {correct} – {'✅' if result == correct else '❌'}")
+
+caps = [[0, 0, 4, 6, 0, 0],
+		[0, 0, 5, 2, 0, 0],
+		[0, 0, 0, 0, 4, 4],
+		[0, 0, 0, 0, 6, 6],
+		[0, 0, 0, 0, 0, 0],
+		[0, 0, 0, 0, 0, 0]]
+queries = [([0, 1], [4, 5]), ([0], [4]), ([1], [4, 5])]
+print("  Test batch solve over a process pool:")
+result = (sorted(solve_many(caps, queries, processes=2)), list(solve_many(CSRGraph.from_matrix(caps), queries)))
+correct = ([(0, 16), (1, 10), (2, 7)], [(0, 16), (1, 10), (2, 7)])
+print(f"    Result is {result} – expected {correct} – {'✅' if result == correct else '❌'}")
+
+print("  Test content-addressed result cache:")
+with tempfile.TemporaryDirectory() as directory:
+	cache = FlowCache(maxsize=1, directory=directory)
+	flows = [cache.solve(sources, sinks, caps) for (sources, sinks) in queries + queries]
+	reopened = FlowCache(directory=directory)
+	flows.append(reopened.solve([0, 1], [4, 5], caps))
+	result = (flows, cache.stats()['misses'], reopened.stats()['disk_hits'])
+correct = ([16, 10, 7, 16, 10, 7, 16], 3, 1)
+print(f"    Result is {result} – expected {correct} – {'✅' if result == correct else '❌'}")
+
+print("  Test memory-mapped graph and solver state:")
+(s, t, C) = normalize_flow_graph([0, 1], [4, 5], caps)
+edges = [(u, v, c) for u in range(len(C)) for (v, c) in enumerate(C[u]) if c]
+with tempfile.TemporaryDirectory() as directory:
+	G = MappedGraph(len(C), edges, directory)
+	(flow, source_side, _) = find_mapped_max_flow(s, t, G, directory, cut=True)
+	G.close()
+	result = (flow, s in source_side, t in source_side, os.listdir(directory))
+correct = (16, True, False, [])
+print(f"    Result is {result} – expected {correct} – {'✅' if result == correct else '❌'}")
+
+lines = b'''c multi-source, multi-sink with a parallel arc
+p max 6 9
+n 1 s
+n 2 s
+n 5 t
+n 6 t
+a 1 3 4
+a 1 4 6
+a 2 3 5
+a 2 4 2
+a 3 5 4
+a 3 6 4
+a 4 5 6
+a 4 6 3
+a 4 6 3'''.splitlines()
+print("  Test DIMACS problem parsing:")
+(s, t, G) = parse_dimacs(lines)
+flow = find_max_flow(s, t, G)
+correct = 16
+print(f"    Result is {flow} – expected {correct} – {'✅' if flow == correct else '❌'}")
+
+print("  Test DIMACS flow writing round trip:")
+(s, t, G) = parse_dimacs(lines)
+(flow, source_side, _) = find_max_flow(s, t, G, cut=True)
+flow_result = FlowResult.from_graph(s, t, G, flow)
+out = io.StringIO()
+write_dimacs_flow(out, flow_result, source_side, 6)
+written = [line.split() for line in out.getvalue().splitlines()]
+result = (
+	[int(value) for (kind, value) in (line for line in written if line[0] == 's')],
+	[(int(u) - 1, int(v) - 1, int(f)) for (kind, u, v, f) in (line for line in written if line[0] == 'f')],
+	{int(u) - 1 for (kind, u) in (line for line in written if line[0] == 'n')}
+)
+correct = (
+	[16],
+	[(u, v, f) for (u, v, f) in flow_result.edges() if u < 6 and v < 6],
+	{u for u in source_side if u < 6}
+)
+errors = []
+for bad in ([b'p max 2 1', b'n 1 s', b'n 2 x'], [b'p max 2 1', b'n 1 s', b'n 2 t', b'a 1 3 4'], [b'p max 2 1', b'n 1 s', b'n 2 t', b'p max 3 1']):
+	try:
+		parse_dimacs(bad)
+	except ValueError:
+		errors.append(True)
+result = (result, errors)
+correct = (correct, [True, True, True])
+print(f"    Result is {result} – expected {correct} – {'✅' if result == correct else '❌'}")
+
+caps = [[0, 7, 0, 0],
+		[0, 0, 6, 0],
+		[0, 0, 0, 8],
+		[0, 0, 0, 0]]
+print("  Test solve instrumentation counters:")
+events = []
+stats = SolveStats(lambda event, data: events.append(event))
+G = CSRGraph.from_matrix(caps)
+result = FlowResult.from_graph(0, 3, G, find_max_flow(0, 3, G, LinkCutForest, stats=stats), stats.as_dict())
+counters = result.stats['counters']
+result = (result.value, counters['phases'], counters['augment'], counters['link'], events)
+correct = (6, 1, 1, 3, ['phase', 'done'])
+print(f"    Result is {result} – expected {correct} – {'✅' if result == correct else '❌'}")
+
+(n, edges, s, t) = chain(100000, seed=1)
+print("  Test long chains without deep recursion:")
+result = [find_max_flow(s, t, CSRGraph(n, edges), make_forest) for make_forest in (PathTreeForest, CompactPathTreeForest, LinkCutForest)]
+correct = [min(c for (u, v, c) in edges)] * 3
+print(f"    Result is {result} – expected {correct} – {'✅' if result == correct else '❌'}")
+
 # # Issue problem
 # caps = [[1321133, 395372, 957723, 106527, 276606, 1383355], [875848, 299757, 165320, 796014, 1342298, 1770557], [698417, 1268211, 1315598, 1949408, 1935813, 1561009], [1405529, 1113099, 1681843, 85185, 1766392, 135347], [1975292, 739290, 454722, 1153202, 242251, 722870], [106120, 1495921, 1886925, 603969, 1013272, 172767]]
 # sources = [2, 4]
@@ -88,3 +370,38 @@ correct = verified_solution(s, t, C)
 stop = time.time()
 print(f"    Push-Relabel execution time: {stop - start}s")
 print(f"    Result is {flow} – expected {correct} – {'✅' if flow == correct else '❌'}")
+start = time.time()
+flow = find_max_flow(s, t, CSRGraph.from_matrix(C))
+stop = time.time()
+print(f"    Sparse Dinic's execution time: {stop - start}s")
+print(f"    Result is {flow} – expected {correct} – {'✅' if flow == correct else '❌'}")
+start = time.time()
+flow = find_max_flow(s, t, CSRGraph.from_matrix(C), LinkCutForest)
+stop = time.time()
+print(f"    Sparse Dinic's with LinkCutForest execution time: {stop - start}s")
+print(f"    Result is {flow} – expected {correct} – {'✅' if flow == correct else '❌'}")
+start = time.time()
+flow = find_max_flow(s, t, CSRGraph.from_matrix(C), CompactPathTreeForest)
+stop = time.time()
+print(f"    Sparse Dinic's with CompactPathTreeForest execution time: {stop - start}s")
+print(f"    Result is {flow} – expected {correct} – {'✅' if flow == correct else '❌'}")
+start = time.time()
+flow = find_max_flow(s, t, CSRGraph.from_matrix(C), LinkCutForest, scaling=True)
+stop = time.time()
+print(f"    Sparse Dinic's with capacity scaling execution time: {stop - start}s")
+print(f"    Result is {flow} – expected {correct} – {'✅' if flow == correct else '❌'}")
+start = time.time()
+flow = vectorized.find_max_flow(s, t, C)
+stop = time.time()
+print(f"    Vectorized Dinic's execution time: {stop - start}s")
+print(f"    Result is {flow} – expected {correct} – {'✅' if flow == correct else '❌'}")
+start = time.time()
+flow = push_relabel.find_max_flow(s, t, C)
+stop = time.time()
+print(f"    Highest-label Push-Relabel execution time: {stop - start}s")
+print(f"    Result is {flow} – expected {correct} – {'✅' if flow == correct else '❌'}")
+start = time.time()
+flow = parallel_push_relabel.find_max_flow(s, t, C, processes=2)
+stop = time.time()
+print(f"    Parallel Push-Relabel execution time: {stop - start}s")
+print(f"    Result is {flow} – expected {correct} – {'✅' if flow == correct else '❌'}")
@@ -0,0 +1,226 @@
+import hashlib
+import json
+import os
+from array import array
+from collections import OrderedDict
+from itertools import chain
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union, cast
+from max_flow.CSRGraph import CSRGraph
+from max_flow.FlowResult import FlowResult
+from max_flow.PathTreeRework import PathTreeForest
+from max_flow.normalize_flow_graph import normalize_flow_graph
+from max_flow.rework import FlowWithCut, ForestFactory, find_max_flow
+
+# (flow, source side, cut edges, (u, v, flow) triples or None)
+Entry = Tuple[int, Set[int], List[Tuple[int, int]], Optional[List[Tuple[int, int, int]]]]
+
+def problem_key(sources: Sequence[int], sinks: Sequence[int], C: List[List[int]]) -> str:
+	"""
+	Hex digest identifying a problem by its capacities and terminals.
+
+	Capacities are hashed as packed 64-bit integers, falling back to their
+	text for larger ones, so that byte-identical problems share a key.
+	"""
+	digest = hashlib.blake2b(digest_size=16)
+	n = len(C)
+	digest.update(array('q', [n, len(sources), len(sinks), *sources, *sinks]).tobytes())
+	try:
+		digest.update(array('q', chain.from_iterable(C)).tobytes())
+	except OverflowError:
+		digest.update(repr([list(row) for row in C]).encode())
+	return digest.hexdigest()
+
+def encode_entry(entry: Entry) -> Dict[str, Any]:
+	"""Lays out an entry as JSON data."""
+	(flow, source_side, cut_edges, edges) = entry
+	return {
+		'flow': flow,
+		'source_side': sorted(source_side),
+		'cut_edges': [list(edge) for edge in cut_edges],
+		'edges': None if edges is None else [list(edge) for edge in edges],
+	}
+
+def decode_entry(data: Dict[str, Any]) -> Entry:
+	"""Reads an entry back from JSON data, raising ValueError if it is malformed."""
+	def integers(values: Any, size: Optional[int] = None) -> Tuple[int, ...]:
+		if not isinstance(values, list) or (size is not None and len(values) != size) or not all((type(v) is int for v in values)):
+			raise ValueError('Malformed cache entry')
+		return tuple(values)
+
+	flow = data['flow']
+	if type(flow) is not int:
+		raise ValueError('Malformed cache entry')
+	source_side = set(integers(data['source_side']))
+	cut_edges = [cast(Tuple[int, int], integers(edge, 2)) for edge in data['cut_edges']]
+	edges = data['edges']
+	if edges is not None:
+		edges = [cast(Tuple[int, int, int], integers(edge, 3)) for edge in edges]
+	return (flow, source_side, cut_edges, edges)
+
+class FlowCache:
+	"""
+	Content-addressed cache of maximum flow results.
+
+	Sits in front of normalize_flow_graph and find_max_flow, keyed by
+	problem_key. Up to maxsize results are held in memory and evicted least
+	recently used first. Given a directory, results are also written there as
+	plain JSON data, one file per key, and the least recently used files are
+	deleted once they take up more than max_bytes. Files that do not hold a
+	well-formed entry are treated as misses, so nothing read from the
+	directory is ever executed. With keep_flows set, results carry per-edge
+	flows as well, which flow_result needs.
+
+	A hit skips the solve entirely. hits, disk_hits and misses count lookups,
+	a disk hit counting towards hits too.
+	"""
+	def __init__(
+			self,
+			maxsize: int = 256,
+			directory: Optional[str] = None,
+			max_bytes: int = 1 << 30,
+			keep_flows: bool = False,
+			make_forest: ForestFactory = PathTreeForest
+		):
+		self.maxsize = maxsize
+		self.directory = directory
+		self.max_bytes = max_bytes
+		self.keep_flows = keep_flows
+		self.make_forest = make_forest
+		self.entries: 'OrderedDict[str, Entry]' = OrderedDict()
+		self.hits = 0
+		self.disk_hits = 0
+		self.misses = 0
+		self.disk_bytes = 0
+		if directory is not None:
+			os.makedirs(directory, exist_ok=True)
+			self.disk_bytes = sum((entry.stat().st_size for entry in os.scandir(directory) if entry.name.endswith('.json')))
+
+	def stats(self) -> Dict[str, Any]:
+		return {
+			'hits': self.hits,
+			'disk_hits': self.disk_hits,
+			'misses': self.misses,
+			'entries': len(self.entries),
+			'disk_bytes': self.disk_bytes,
+		}
+
+	def solve(self, sources: Sequence[int], sinks: Sequence[int], C: List[List[int]], cut: bool = False) -> Union[int, FlowWithCut]:
+		"""Returns what find_max_flow gives on normalize_flow_graph(sources, sinks, C)."""
+		(flow, source_side, cut_edges, _) = self.lookup(sources, sinks, C, False)
+		if not cut:
+			return flow
+		return (flow, set(source_side), list(cut_edges))
+
+	def flow_result(self, sources: Sequence[int], sinks: Sequence[int], C: List[List[int]]) -> FlowResult:
+		"""
+		Returns the flow along each edge of the normalized graph, whose
+		terminals are the normalized ones. Needs keep_flows.
+		"""
+		if not self.keep_flows:
+			raise ValueError('Per-edge flows are only cached with keep_flows set')
+		(flow, _, _, edges) = self.lookup(sources, sinks, C, True)
+		(s, t, n) = self._terminals(sources, sinks, len(C))
+		edges = edges or []
+		return FlowResult(s, t, n, flow, [u for (u, _, _) in edges], [v for (_, v, _) in edges], [f for (_, _, f) in edges])
+
+	def lookup(self, sources: Sequence[int], sinks: Sequence[int], C: List[List[int]], flows: bool) -> Entry:
+		"""Finds the entry of a problem, solving it on a miss."""
+		key = problem_key(sources, sinks, C)
+		entry = self.entries.get(key)
+		if entry is not None and (entry[3] is not None or not flows):
+			self.entries.move_to_end(key)
+			self.hits += 1
+			return entry
+
+		entry = self._read(key)
+		if entry is not None and (entry[3] is not None or not flows):
+			self.hits += 1
+			self.disk_hits += 1
+			self._remember(key, entry)
+			return entry
+
+		self.misses += 1
+		entry = self._solve(sources, sinks, C)
+		self._remember(key, entry)
+		self._write(key, entry)
+		return entry
+
+	def clear(self) -> None:
+		"""Drops every cached result, on disk included."""
+		self.entries.clear()
+		if self.directory is not None:
+			for entry in os.scandir(self.directory):
+				if entry.name.endswith('.json'):
+					os.remove(entry.path)
+			self.disk_bytes = 0
+
+	def _solve(self, sources: Sequence[int], sinks: Sequence[int], C: List[List[int]]) -> Entry:
+		(s, t, C_n) = normalize_flow_graph(list(sources), list(sinks), C)
+		G = CSRGraph.from_matrix(C_n)
+		(flow, source_side, cut_edges) = find_max_flow(s, t, G, self.make_forest, cut=True)
+		edges = FlowResult.from_graph(s, t, G, flow).edges() if self.keep_flows else None
+		return (flow, source_side, cut_edges, edges)
+
+	def _terminals(self, sources: Sequence[int], sinks: Sequence[int], n: int) -> Tuple[int, int, int]:
+		"""Terminals and size of the normalized graph, as normalize_flow_graph numbers them."""
+		s = sources[0] if len(sources) == 1 else n
+		n += len(sources) != 1
+		t = sinks[0] if len(sinks) == 1 else n
+		n += len(sinks) != 1
+		return (s, t, n)
+
+	def _remember(self, key: str, entry: Entry) -> None:
+		self.entries[key] = entry
+		self.entries.move_to_end(key)
+		while len(self.entries) > self.maxsize:
+			self.entries.popitem(last=False)
+
+	""" DISK TIER """
+	def _read(self, key: str) -> Optional[Entry]:
+		if self.directory is None:
+			return None
+		path = os.path.join(self.directory, key + '.json')
+		try:
+			with open(path, 'rb') as file:
+				data = json.load(file)
+			entry = decode_entry(data)
+		except (OSError, ValueError, TypeError, KeyError):
+			return None
+		# Modification times order the files by last use
+		os.utime(path)
+		return entry
+
+	def _write(self, key: str, entry: Entry) -> None:
+		if self.directory is None:
+			return
+		path = os.path.join(self.directory, key + '.json')
+		data = json.dumps(encode_entry(entry), separators=(',', ':')).encode()
+		try:
+			self.disk_bytes -= os.path.getsize(path)
+		except OSError:
+			pass
+		# Write beside the target and rename, so readers never see half a file
+		temporary = f'{path}.{os.getpid()}.tmp'
+		with open(temporary, 'wb') as file:
+			file.write(data)
+		os.replace(temporary, path)
+		self.disk_bytes += len(data)
+		if self.disk_bytes > self.max_bytes:
+			self._evict(self.directory)
+
+	def _evict(self, directory: str) -> None:
+		"""Deletes the least recently used files until the tier fits in max_bytes."""
+		files = sorted(
+			(entry.stat().st_mtime, entry.stat().st_size, entry.path)
+			for entry in os.scandir(directory)
+			if entry.name.endswith('.json')
+		)
+		self.disk_bytes = sum((size for (_, size, _) in files))
+		for (_, size, path) in files:
+			if self.disk_bytes <= self.max_bytes:
+				break
+			try:
+				os.remove(path)
+			except OSError:
+				continue
+			self.disk_bytes -= size
@@ -0,0 +1,141 @@
+import mmap
+from array import array
+from typing import Iterable, List, Optional, Set, TextIO, Tuple
+from max_flow.CSRGraph import CSRGraph
+from max_flow.FlowResult import FlowResult
+from max_flow.TerminalOverlay import overlay_flow_graph
+
+def read_dimacs(path: str, memory_map: bool = False) -> Tuple[int, int, CSRGraph]:
+	"""
+	Streams a DIMACS .max file straight into a CSR graph.
+
+	Parallel arcs are merged. Several `n ID s` or `n ID t` lines are wired
+	to virtual terminals by overlay_flow_graph, so G is then a
+	TerminalOverlay whose terminals are nodes n and n + 1. DIMACS ids are
+	1-based and become 0-based nodes. Returns (s, t, G) with n = the node
+	count of the `p` line.
+	"""
+	with open(path, 'rb') as file:
+		if memory_map:
+			with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+				return parse_dimacs(iter(mm.readline, b''))
+		return parse_dimacs(file)
+
+def parse_dimacs(lines: Iterable[bytes]) -> Tuple[int, int, CSRGraph]:
+	"""
+	Builds a graph from the lines of a DIMACS .max problem.
+
+	Arcs are appended to flat arrays of tails, heads and capacities as they
+	stream in, then grouped by tail and merged by a counting pass, so no
+	per-arc objects are kept. Malformed lines, repeated problem lines,
+	unknown node designations and node ids outside the problem line's range
+	raise ValueError.
+	"""
+	n: Optional[int] = None
+	sources: List[int] = []
+	sinks: List[int] = []
+	tails = array('q')
+	heads = array('q')
+	capacities: List[int] = []
+	out_degree = array('q')
+
+	def node(number: int, field: bytes) -> int:
+		u = int(field) - 1
+		if not 0 <= u < n:
+			raise ValueError(f'Line {number}: node {field.decode()} outside 1..{n}')
+		return u
+
+	for (number, line) in enumerate(lines, 1):
+		fields = line.split()
+		if len(fields) == 0:
+			continue
+		kind = fields[0]
+		if kind == b'a':
+			if n is None:
+				raise ValueError(f'Line {number}: arc before problem line')
+			if len(fields) != 4:
+				raise ValueError(f'Line {number}: malformed arc line')
+			u = node(number, fields[1])
+			v = node(number, fields[2])
+			c = int(fields[3])
+			if c < 0:
+				raise ValueError(f'Line {number}: negative capacity')
+			if c and u != v:
+				tails.append(u)
+				heads.append(v)
+				capacities.append(c)
+				out_degree[u + 1] += 1
+		elif kind == b'n':
+			if n is None:
+				raise ValueError(f'Line {number}: node designation before problem line')
+			if len(fields) != 3 or fields[2] not in (b's', b't'):
+				raise ValueError(f'Line {number}: node designation must be s or t')
+			(sources if fields[2] == b's' else sinks).append(node(number, fields[1]))
+		elif kind == b'p':
+			if n is not None:
+				raise ValueError(f'Line {number}: repeated problem line')
+			if len(fields) < 3 or fields[1] != b'max':
+				raise ValueError(f'Line {number}: not a max flow problem')
+			n = int(fields[2])
+			out_degree = array('q', bytes(8 * (n + 1)))
+		elif kind != b'c':
+			raise ValueError(f'Line {number}: unknown line type {kind!r}')
+
+	if n is None:
+		raise ValueError('Missing problem line')
+	if len(sources) == 0 or len(sinks) == 0:
+		raise ValueError('Missing source or sink designation')
+
+	# Group the arcs by tail
+	for u in range(n):
+		out_degree[u + 1] += out_degree[u]
+	order = array('q', bytes(8 * len(tails)))
+	fill = out_degree[:n]
+	for i in range(len(tails)):
+		u = tails[i]
+		order[fill[u]] = i
+		fill[u] += 1
+
+	# Merge parallel arcs, remembering where each head last got its arc
+	merged_tails = array('q')
+	merged_heads = array('q')
+	merged_capacities: List[int] = []
+	owner = array('q', [-1]) * n # Tail whose arcs last reached each head
+	slot = array('q', bytes(8 * n)) # Merged arc of that tail to each head
+	for u in range(n):
+		for i in order[out_degree[u]:out_degree[u + 1]]:
+			v = heads[i]
+			if owner[v] == u:
+				merged_capacities[slot[v]] += capacities[i]
+			else:
+				owner[v] = u
+				slot[v] = len(merged_tails)
+				merged_tails.append(u)
+				merged_heads.append(v)
+				merged_capacities.append(capacities[i])
+	del tails, heads, capacities, order, owner, slot
+
+	G = CSRGraph.from_edge_arrays(n, merged_tails, merged_heads, merged_capacities)
+	return overlay_flow_graph(sources, sinks, G)
+
+def write_dimacs_flow(
+		out: TextIO,
+		result: FlowResult,
+		source_side: Optional[Set[int]] = None,
+		n: Optional[int] = None
+	) -> None:
+	"""
+	Writes a solution in DIMACS flow format: an `s` line with the flow value
+	and one `f SRC DST FLOW` line per edge carrying flow. With source_side,
+	the minimum cut follows as one `n ID` line per source-side node. Nodes from
+	n onward are taken to be virtual terminals and left out.
+	"""
+	limit = result.n if n is None else n
+	out.write(f's {result.value}\n')
+	for (u, v, f) in zip(result.tails, result.heads, result.flows):
+		if u < limit and v < limit:
+			out.write(f'f {u + 1} {v + 1} {f}\n')
+	if source_side is not None:
+		for u in sorted(source_side):
+			if u < limit:
+				out.write(f'n {u + 1}\n')
@@ -0,0 +1,95 @@
+from random import Random
+from typing import List, Tuple
+
+# (n, edges, source, sink) with edges as (u, v, capacity) triples
+Instance = Tuple[int, List[Tuple[int, int, int]], int, int]
+
+def random_sparse(n: int, degree: int = 4, max_capacity: int = 1000, seed: int = 0) -> Instance:
+	"""Uniformly random arcs, degree times n of them, between distinct nodes."""
+	rng = Random(seed)
+	edges = []
+	while len(edges) < n * degree:
+		u = rng.randrange(n)
+		v = rng.randrange(n)
+		if u != v:
+			edges.append((u, v, rng.randrange(1, max_capacity)))
+	return (n, edges, 0, n - 1)
+
+def layered(layers: int, width: int, degree: int = 3, max_capacity: int = 1000, seed: int = 0) -> Instance:
+	"""Layers of equal width with arcs only between consecutive layers."""
+	rng = Random(seed)
+	n = layers * width + 2
+	s = n - 2
+	t = n - 1
+	edges = [(s, v, max_capacity * degree) for v in range(width)]
+	edges.extend(((layers - 1) * width + u, t, max_capacity * degree) for u in range(width))
+	for layer in range(layers - 1):
+		for u in range(layer * width, (layer + 1) * width):
+			for v in rng.sample(range((layer + 1) * width, (layer + 2) * width), min(degree, width)):
+				edges.append((u, v, rng.randrange(1, max_capacity)))
+	return (n, edges, s, t)
+
+def ak(k: int) -> Instance:
+	"""
+	AK-style worst case for shortest augmenting path methods.
+
+	A chain of k nodes with wide arcs, where node i also drains one unit into
+	the sink. Augmenting path lengths grow by one every phase, so Dinic's
+	algorithm runs k phases over the whole chain.
+	"""
+	n = k + 2
+	s = k
+	t = k + 1
+	edges = [(s, 0, k)]
+	edges.extend((i, i + 1, k) for i in range(k - 1))
+	edges.extend((i, t, 1) for i in range(k))
+	return (n, edges, s, t)
+
+def grid(rows: int, cols: int, max_capacity: int = 100, seed: int = 0) -> Instance:
+	"""
+	Vision-style grid: every pixel is tied to the source and the sink by
+	terminal arcs and to its four neighbours in both directions.
+	"""
+	rng = Random(seed)
+	n = rows * cols + 2
+	s = n - 2
+	t = n - 1
+	edges = []
+	for r in range(rows):
+		for c in range(cols):
+			u = r * cols + c
+			edges.append((s, u, rng.randrange(max_capacity)))
+			edges.append((u, t, rng.randrange(max_capacity)))
+			if c + 1 < cols:
+				edges.append((u, u + 1, rng.randrange(1, max_capacity)))
+				edges.append((u + 1, u, rng.randrange(1, max_capacity)))
+			if r + 1 < rows:
+				edges.append((u, u + cols, rng.randrange(1, max_capacity)))
+				edges.append((u + cols, u, rng.randrange(1, max_capacity)))
+	return (n, [e for e in edges if e[2]], s, t)
+
+def bipartite(left: int, right: int, degree: int = 3, seed: int = 0) -> Instance:
+	"""Unit capacity bipartite matching between a left and a right side."""
+	rng = Random(seed)
+	n = left + right + 2
+	s = n - 2
+	t = n - 1
+	edges = [(s, u, 1) for u in range(left)]
+	edges.extend((left + v, t, 1) for v in range(right))
+	for u in range(left):
+		for v in rng.sample(range(right), min(degree, right)):
+			edges.append((u, left + v, 1))
+	return (n, edges, s, t)
+
+def chain(n: int, max_capacity: int = 1000, seed: int = 0) -> Instance:
+	"""A single path from node 0 to node n - 1 with random capacities."""
+	rng = Random(seed)
+	return (n, [(i, i + 1, rng.randrange(1, max_capacity)) for i in range(n - 1)], 0, n - 1)
+
+def to_matrix(instance: Instance) -> List[List[int]]:
+	"""Dense capacity matrix of an instance, merging parallel arcs."""
+	(n, edges, s, t) = instance
+	C = [[0] * n for i in range(n)]
+	for (u, v, c) in edges:
+		C[u][v] += c
+	return C
@@ -0,0 +1,122 @@
+from collections import Counter, defaultdict
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from max_flow.LinkCutForest import NONE, LinkCutForest
+from max_flow.PathTreeRework import PathTree, PathTreeForest
+
+Callback = Callable[[str, Dict[str, Any]], None]
+
+class SolveStats:
+	"""
+	Opt-in counters and timers for a single solve.
+
+	Solvers only touch a SolveStats when one is passed in, and dynamic trees are
+	only counted when their factory is swapped for the counting subclass built
+	by instrument, so leaving stats out keeps the hot paths untouched.
+
+	Counters cover phases, level graph sizes, advance, augment and retreat
+	steps, and rotations, splices, links and cuts. Timers split time between
+	level graph construction and blocking flows. The callback, if any, is
+	called with ('phase', record) after every blocking flow and ('done',
+	summary) when the solve ends.
+	"""
+	def __init__(self, callback: Optional[Callback] = None):
+		self.counters: Counter = Counter()
+		self.timers: Dict[str, float] = defaultdict(float)
+		self.phases: List[Dict[str, Any]] = []
+		self.callback = callback
+
+	def as_dict(self) -> Dict[str, Any]:
+		return {
+			'counters': dict(self.counters),
+			'timers': dict(self.timers),
+			'phases': list(self.phases),
+		}
+
+	""" SOLVER HOOKS """
+	def level_graph_built(self, depth: int, level_of: Sequence[Optional[int]], exits: Sequence[Sequence[Any]], started: float) -> float:
+		"""Records a level graph reaching the sink. Returns the time it was called."""
+		now = perf_counter()
+		record = {
+			'phase': len(self.phases) + 1,
+			'depth': depth,
+			'nodes': sum((1 for level in level_of if level is not None and level >= 0)),
+			'arcs': sum((len(exit) for exit in exits)),
+			'level_graph_seconds': now - started,
+		}
+		self.phases.append(record)
+		self.counters['phases'] += 1
+		self.counters['level_graph_nodes'] += record['nodes']
+		self.counters['level_graph_arcs'] += record['arcs']
+		self.timers['level_graph'] += now - started
+		return now
+
+	def blocking_flow_sent(self, started: float) -> float:
+		"""Records the blocking flow of the latest phase. Returns the time it was called."""
+		now = perf_counter()
+		record = self.phases[-1]
+		record['blocking_flow_seconds'] = now - started
+		self.timers['blocking_flow'] += now - started
+		if self.callback is not None:
+			self.callback('phase', record)
+		return now
+
+	def finished(self, started: float) -> None:
+		"""Records the final, failed level graph construction."""
+		self.timers['level_graph'] += perf_counter() - started
+		if self.callback is not None:
+			self.callback('done', self.as_dict())
+
+	""" DYNAMIC TREES """
+	def instrument(self, make_forest: Callable[[int], Any]) -> Callable[[int], Any]:
+		"""Returns a counting subclass of PathTreeForest or LinkCutForest."""
+		counters = self.counters
+
+		if isinstance(make_forest, type) and issubclass(make_forest, LinkCutForest):
+			class CountingLinkCutForest(make_forest): # type: ignore
+				def _rotate(self, x: int) -> None:
+					counters['rotate'] += 1
+					super()._rotate(x)
+
+				def _splice(self, y: int, last: int) -> None:
+					if last != NONE:
+						counters['splice'] += 1
+					super()._splice(y, last)
+
+				def link(self, x: int, w: int) -> None:
+					counters['link'] += 1
+					super().link(x, w)
+
+				def cut(self, x: int) -> None:
+					counters['cut'] += 1
+					super().cut(x)
+
+			return CountingLinkCutForest
+
+		if isinstance(make_forest, type) and issubclass(make_forest, PathTreeForest):
+			class CountingPathTree(make_forest.node): # type: ignore
+				def _rotate(self, lookAhead=None):
+					if lookAhead or self.side is not None:
+						counters['rotate'] += 1
+					return super()._rotate(lookAhead)
+
+				def _splice(self):
+					parent = super()._splice()
+					if parent is not None:
+						counters['splice'] += 1
+					return parent
+
+				def link(self, other: PathTree):
+					counters['link'] += 1
+					super().link(other)
+
+				def cut(self):
+					counters['cut'] += 1
+					return super().cut()
+
+			class CountingPathTreeForest(make_forest): # type: ignore
+				node = CountingPathTree
+
+			return CountingPathTreeForest
+
+		raise TypeError(f'Cannot instrument {make_forest!r}')
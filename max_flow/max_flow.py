@@ -1,11 +1,11 @@
-from typing import List, Optional, cast
+from typing import Dict, List, Optional, cast
 from util.constants import NULL
 from max_flow.is_node import is_node
 from max_flow.Edge import Edge
+from max_flow.FlowResult import FlowResult
 from max_flow.PathTree import PathTree
-import numpy as np
 
-def max_flow(s_i: int, t_i: int, C: List[List[int]], MAX_FLOW: int) -> int:
+def max_flow(s_i: int, t_i: int, C: List[List[int]], MAX_FLOW: int) -> FlowResult:
 	# Initialize graph
 	n = len(C)
 	nodes = [PathTree(u_i) for u_i in range(n)]
@@ -21,7 +21,7 @@ def max_flow(s_i: int, t_i: int, C: List[List[int]], MAX_FLOW: int) -> int:
 			levels[u_i] = 0
 			source = u
 		elif u_i is t_i: sink = u
-	flow_graph = [[0 for i in range(n)] for i in range(n)]
+	flow_graph: List[Dict[int, int]] = [{} for i in range(n)] # Flow of each retired edge
 
 	# Safety checks
 	if source is None: raise RuntimeError('Failed to assign source during graph creation')
@@ -78,8 +78,9 @@ def max_flow(s_i: int, t_i: int, C: List[List[int]], MAX_FLOW: int) -> int:
 			dead = u.remove_exiting(uv, flow_graph, False)
 			[nodes.remove(d) for d in dead]
 
-	print(np.matrix(flow_graph))
-	return flow
+	edges = [(u_i, v_i, f) for u_i in range(n) for (v_i, f) in flow_graph[u_i].items() if f]
+	(tails, heads, flows) = (list(column) for column in zip(*edges)) if edges else ([], [], [])
+	return FlowResult(s_i, t_i, n, flow, tails, heads, flows)
 
 # Blocking flow solver
 def find_blocking_flow(s: PathTree, t: PathTree, graph: List[PathTree], flow_graph, MAX_FLOW: int) -> int:
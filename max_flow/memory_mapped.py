@@ -0,0 +1,211 @@
+import os
+import shutil
+import tempfile
+from typing import Iterable, List, Optional, Set, Tuple, Union
+import numpy as np
+from max_flow.CSRGraph import CSRGraph
+
+Edge = Tuple[int, int, int]
+# (flow, source side, saturated edges crossing the cut)
+FlowWithCut = Tuple[int, Set[int], List[Tuple[int, int]]]
+
+class ScratchSpace:
+	"""A scratch directory of int64 numpy.memmap arrays, removed by close."""
+	def __init__(self, directory: Optional[str] = None):
+		self.path = tempfile.mkdtemp(prefix='max_flow-', dir=directory)
+		self.arrays: List[np.memmap] = []
+
+	def array(self, name: str, size: int) -> np.ndarray:
+		# Empty files cannot be mapped, so every file holds at least one slot
+		mapped = np.memmap(os.path.join(self.path, name), dtype=np.int64, mode='w+', shape=(max(size, 1),))
+		self.arrays.append(mapped)
+		return mapped[:size]
+
+	def close(self) -> None:
+		self.arrays.clear()
+		shutil.rmtree(self.path, ignore_errors=True)
+
+class MappedGraph(CSRGraph):
+	"""
+	CSRGraph whose offsets, heads, pairs, capacities and residuals are
+	numpy.memmap files in a scratch directory, so that the operating system
+	pages them in and out instead of holding them in memory.
+
+	edges is read twice, once to count degrees and once to place the arcs, so
+	it must be a collection or other iterable that can be walked again. The
+	arrays are exposed as memoryviews for fast scalar access. close releases
+	them and removes the files.
+	"""
+	def __init__(self, n: int, edges: Iterable[Edge], directory: Optional[str] = None):
+		self.n = n
+		self.space = ScratchSpace(directory)
+		offsets = self.space.array('offsets', n + 1)
+		degree = memoryview(offsets)
+		k = 0
+		for (u, v, c) in edges:
+			if c and u != v:
+				degree[u + 1] += 1
+				degree[v + 1] += 1
+				k += 1
+		np.cumsum(offsets, out=offsets)
+
+		m = 2 * k
+		heads = self.space.array('heads', m)
+		pair = self.space.array('pair', m)
+		capacity = self.space.array('capacity', m)
+		residual = self.space.array('residual', m)
+		fill_array = self.space.array('fill', n)
+		fill_array[:] = offsets[:n]
+		self.offsets = degree
+		self.heads = memoryview(heads)
+		self.pair = memoryview(pair)
+		self.capacity = memoryview(capacity)
+		self.residual = memoryview(residual)
+
+		fill = memoryview(fill_array)
+		for (u, v, c) in edges:
+			if c and u != v:
+				a = fill[u]
+				b = fill[v]
+				fill[u] += 1
+				fill[v] += 1
+				self.heads[a] = v
+				self.heads[b] = u
+				self.pair[a] = b
+				self.pair[b] = a
+				self.capacity[a] = c
+				self.residual[a] = c
+		fill.release()
+		del fill_array
+
+	@classmethod
+	def from_graph(cls, G: CSRGraph, directory: Optional[str] = None) -> 'MappedGraph':
+		"""Copies a CSR graph, flow included, into memory-mapped arrays."""
+		edges = [(u, G.heads[a], G.capacity[a]) for u in range(len(G)) for a in G.arcs(u) if G.capacity[a]]
+		mapped = cls(len(G), edges, directory)
+		mapped.residual[:] = memoryview(np.asarray(G.residual, dtype=np.int64))
+		return mapped
+
+	def close(self) -> None:
+		"""Releases the arrays and removes their files."""
+		for view in (self.offsets, self.heads, self.pair, self.capacity, self.residual):
+			view.release()
+		self.space.close()
+
+def find_mapped_max_flow(
+		s: int,
+		t: int,
+		G: CSRGraph,
+		directory: Optional[str] = None,
+		cut: bool = False
+	) -> Union[int, FlowWithCut]:
+	"""
+	Find the maximum flow in a CSR network, such as a MappedGraph, with the
+	per-node solver state also held in numpy.memmap files.
+
+	Runs Dinic's algorithm without materializing level graphs: an arc is in
+	the level graph when it has residual capacity and climbs one level, which
+	each pass checks as it scans a node's arcs. The breadth first search reads
+	its queue front to back and the arcs of each dequeued node in order, and
+	blocking flows are depth first searches whose current arc pointers only
+	move forward, so both passes walk the arc arrays mostly sequentially.
+	Levels, the queue, current arcs and the augmenting path live in a scratch
+	directory under directory, removed once the solve ends. Nothing larger
+	than them is held in memory until the cut, if asked for, is collected.
+
+	The flow is left in G's residuals. Returns the same results as
+	rework.find_sparse_max_flow.
+	"""
+	n = len(G)
+	offsets = G.offsets
+	heads = G.heads
+	pair = G.pair
+	R = G.residual
+	space = ScratchSpace(directory)
+	level_array = space.array('level', n)
+	current_array = space.array('current', n)
+	level = memoryview(level_array)
+	queue = memoryview(space.array('queue', n))
+	current = memoryview(current_array)
+	path = memoryview(space.array('path', n)) # Arcs of the augmenting path
+	try:
+		while True:
+			# Level the nodes by breadth first search, up to the sink's level
+			level_array.fill(-1)
+			level[s] = 0
+			queue[0] = s
+			head = 0
+			tail = 1
+			while head < tail:
+				u = queue[head]
+				head += 1
+				if level[t] != -1 and level[u] >= level[t]:
+					break
+				l = level[u] + 1
+				for a in range(offsets[u], offsets[u + 1]):
+					v = heads[a]
+					if R[a] and level[v] == -1:
+						level[v] = l
+						queue[tail] = v
+						tail += 1
+			if level[t] == -1:
+				break
+
+			# Send a blocking flow by depth first search along climbing arcs
+			current_array[:] = offsets[:n]
+			depth = 0
+			u = s
+			while True:
+				if u == t:
+					d = min((R[path[i]] for i in range(depth)))
+					k = -1
+					for i in range(depth):
+						a = path[i]
+						R[a] -= d
+						R[pair[a]] += d
+						if k == -1 and R[a] == 0:
+							k = i
+					# Resume from the tail of the first saturated arc
+					depth = k
+					u = heads[pair[path[k]]]
+					continue
+
+				end = offsets[u + 1]
+				a = current[u]
+				l = level[u] + 1
+				while a < end and not (R[a] and level[heads[a]] == l):
+					a += 1
+				current[u] = a
+				if a < end:
+					path[depth] = a
+					depth += 1
+					u = heads[a]
+				elif u == s:
+					break
+				else:
+					# Retreat: u is a dead end for this phase
+					level[u] = -1
+					depth -= 1
+					u = heads[pair[path[depth]]]
+					current[u] += 1
+
+		# Net flow out of the source
+		flow = sum((G.flow(a) for a in G.arcs(s)))
+		if not cut:
+			return flow
+
+		# The failed search reached exactly the source side
+		capacity = G.capacity
+		source_side = {u for u in range(n) if level[u] != -1}
+		cut_edges = [
+			(u, heads[a])
+			for u in source_side
+			for a in G.arcs(u)
+			if capacity[a] and level[heads[a]] == -1
+		]
+		return (flow, source_side, cut_edges)
+	finally:
+		for view in (level, queue, current, path):
+			view.release()
+		del level_array, current_array
+		space.close()
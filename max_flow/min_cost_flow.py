@@ -0,0 +1,217 @@
+from math import isqrt
+from typing import List, Sequence, Set, Tuple, Union
+from max_flow.CSRGraph import CSRGraph
+from max_flow.LinkCutForest import LinkCutForest
+
+# (flow, cost, flow along each edge)
+MinCostFlow = Tuple[int, int, Union[List[List[int]], List[int]]]
+
+def find_min_cost_flow(
+		s: int,
+		t: int,
+		C: Union[List[List[int]], CSRGraph],
+		W: Union[List[List[int]], Sequence[int]]
+	) -> MinCostFlow:
+	"""
+	Find the cheapest of the maximum flows in a network whose edges cost W per
+	unit of flow.
+
+	W is a cost matrix alongside a dense C, or a cost per arc of a CSR graph,
+	where only the costs of the forward arcs are read. The flows are returned
+	in the same form: a flow matrix for dense networks, and for CSR graphs the
+	flow along each arc, negative on reverse arcs, as left in G's residuals.
+	Costs may be negative, in which case negative cycles are filled as well.
+	"""
+	if isinstance(C, CSRGraph):
+		G = C
+		costs = list(W)
+	else:
+		G = CSRGraph.from_matrix(C)
+		costs = [0] * len(G.heads)
+		for u in range(len(G)):
+			for a in G.arcs(u):
+				if G.capacity[a]:
+					costs[a] = W[u][G.heads[a]]
+
+	cost = send_min_cost_flow(s, t, G, costs)
+	flow = sum((G.flow(a) for a in G.arcs(s)))
+	if isinstance(C, CSRGraph):
+		return (flow, cost, [G.flow(a) for a in range(len(G.heads))])
+
+	F = [[0] * len(G) for i in range(len(G))]
+	for u in range(len(G)):
+		for a in G.arcs(u):
+			if G.capacity[a]:
+				F[u][G.heads[a]] += G.flow(a)
+	return (flow, cost, F)
+
+def send_min_cost_flow(s: int, t: int, G: CSRGraph, costs: Sequence[int]) -> int:
+	"""
+	Solves G in place by the network simplex method, returning the cost.
+
+	Maximum flow is made the first priority by closing the network into a
+	circulation with a return edge from t to s whose cost outweighs any path,
+	and the circulation of least cost is found from the empty one. A virtual
+	root node n is joined to every node by an edge carrying no flow, and these
+	edges start out as the spanning tree.
+
+	The spanning tree is kept in two LinkCutForests of identical shape, one
+	holding the residual of every tree edge towards the root and the other
+	away from it. Each pivot finds the apex of its cycle as their lowest
+	common ancestor and the leaving edge and the flow update each by a few
+	path operations, with the edges above the apex shielded by a large
+	constant. Of several blocking edges the last one met going around the
+	cycle from the apex leaves, which keeps the tree strongly feasible and
+	rules out cycling. Node potentials are shifted over the subtree that is
+	rehung, and entering edges are priced in blocks of about √m arcs.
+	"""
+	n = len(G)
+	m = len(G.heads)
+	root = n
+	heads = list(G.heads)
+	pair = list(G.pair)
+	cost = [0] * m
+	for a in range(m):
+		if G.capacity[a]:
+			cost[a] = costs[a]
+			cost[pair[a]] = -costs[a]
+	R = list(G.residual)
+
+	# Return edge, then the root edges of each node, as arc pairs
+	bound = sum(G.capacity) + 1 # More than any edge could carry
+	return_arc = m
+	heads += [s, t]
+	pair += [m + 1, m]
+	weight = max((abs(w) for w in cost), default=0)
+	cost += [-(n * weight + 1), n * weight + 1]
+	R += [bound, 0]
+	for v in range(n):
+		heads += [root, v]
+		pair += [len(pair) + 1, len(pair)]
+		cost += [0, 0]
+		R += [bound, 0]
+
+	up_residual = LinkCutForest(n + 1) # Residual of each tree edge towards the root
+	down_residual = LinkCutForest(n + 1) # Residual of each tree edge away from it
+	parent = [root] * n + [-1]
+	up = [return_arc + 2 + 2 * v for v in range(n)] + [-1] # Arc from each node to its parent
+	children: List[Set[int]] = [set() for v in range(n)] + [set(range(n))]
+	potential = [0] * (n + 1)
+	for v in range(n):
+		up_residual.add_cost(v, bound)
+		up_residual.link(v, root)
+		down_residual.link(v, root)
+	shield = 4 * bound
+
+	""" UTILITY FUNCTIONS """
+	def path_min(forest: LinkCutForest, v: int, apex: int, deepest: bool) -> int:
+		"""Finds the blocking node on the tree path from v up to apex."""
+		forest.add_cost(apex, shield)
+		u = forest.find_deepest_min(v) if deepest else forest.find_min(v)
+		forest.add_cost(apex, -shield)
+		return u
+
+	def send(v: int, apex: int, d: int, forward: LinkCutForest, backward: LinkCutForest) -> None:
+		"""Moves d units through the forward residuals of the tree path from v up to apex."""
+		forward.add_cost(v, -d)
+		forward.add_cost(apex, d)
+		backward.add_cost(v, d)
+		backward.add_cost(apex, -d)
+
+	def set_root_cost(forest: LinkCutForest, v: int, c: int) -> None:
+		forest.add_cost(v, c - forest.find_cost(v))
+
+	def pivot(e: int) -> None:
+		"""Sends flow around the cycle closed by arc e and updates the tree."""
+		x = heads[pair[e]]
+		y = heads[e]
+		apex = up_residual.find_lca(x, y)
+
+		# The cycle runs down from the apex to x, along e and up from y
+		d = R[e]
+		leaving = -1 # Node whose tree edge leaves, if not e itself
+		z = -1 # End of e below the leaving edge
+		if x != apex:
+			u = path_min(down_residual, x, apex, True)
+			if down_residual.find_cost(u) < d:
+				d = down_residual.find_cost(u)
+				(leaving, z) = (u, x)
+		if y != apex:
+			u = path_min(up_residual, y, apex, False)
+			if up_residual.find_cost(u) <= d:
+				d = up_residual.find_cost(u)
+				(leaving, z) = (u, y)
+
+		if d > 0:
+			R[e] -= d
+			R[pair[e]] += d
+			if x != apex:
+				send(x, apex, d, down_residual, up_residual)
+			if y != apex:
+				send(y, apex, d, up_residual, down_residual)
+		if leaving == -1:
+			return
+
+		# Rehang the subtree cut off by the leaving edge from e's end inside it
+		(other, a) = (y, e) if z == x else (x, pair[e])
+		path = [z]
+		while path[-1] != leaving:
+			path.append(parent[path[-1]])
+		residuals = [(up_residual.find_cost(v), down_residual.find_cost(v)) for v in path]
+		(R[up[leaving]], R[pair[up[leaving]]]) = residuals[-1]
+		for v in path:
+			up_residual.cut(v)
+			down_residual.cut(v)
+			children[parent[v]].discard(v)
+
+		arcs = [a] + [pair[up[v]] for v in path[:-1]]
+		ends = [other] + path[:-1]
+		links = [(R[a], R[pair[a]])] + [(down, up_) for (up_, down) in residuals[:-1]]
+		for (v, p, b, (up_c, down_c)) in zip(path, ends, arcs, links):
+			set_root_cost(up_residual, v, up_c)
+			set_root_cost(down_residual, v, down_c)
+			up_residual.link(v, p)
+			down_residual.link(v, p)
+			parent[v] = p
+			up[v] = b
+			children[p].add(v)
+
+		# Restore zero reduced costs along the tree
+		shift = potential[other] + cost[a] - potential[z]
+		stack = [z]
+		while len(stack) > 0:
+			v = stack.pop()
+			potential[v] += shift
+			stack.extend(children[v])
+
+	"""
+	MAIN LOOP:
+
+	Pivot on the most negative reduced cost of each block of arcs, until a
+	full sweep over the arcs finds none.
+	"""
+	priced = return_arc + 2 # Arcs that may enter the tree
+	block = max(isqrt(priced), 16)
+	start = 0
+	clean = 0 # Arcs priced since the last pivot
+	while clean < priced:
+		best = 0
+		entering = -1
+		for a in range(start, min(start + block, priced)):
+			c = cost[a] - potential[heads[pair[a]]] + potential[heads[a]]
+			if c < best and R[a] > 0:
+				best = c
+				entering = a
+		clean += min(start + block, priced) - start
+		start = start + block if start + block < priced else 0
+		if entering != -1:
+			pivot(entering)
+			clean = 0
+
+	# Read the residuals of the tree edges back out of the forests
+	for v in range(n):
+		a = up[v]
+		R[a] = up_residual.find_cost(v)
+		R[pair[a]] = down_residual.find_cost(v)
+	G.residual[:] = R[:m]
+	return sum((costs[a] * G.flow(a) for a in range(m) if G.capacity[a]))
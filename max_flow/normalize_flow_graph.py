@@ -1,8 +1,10 @@
 from typing import List
 
 def normalize_flow_graph(s: List[int], t: List[int], C: List[List[int]]):
-	# Copy capacity matrix
-	C_n = [[C[i][j] for j in range(len(C))] for i in range(len(C))]
+	# Copy capacity matrix; TerminalOverlay avoids the copy for CSR solvers
+	C_n = [list(row) for row in C]
+	sources = set(s)
+	sinks = set(t)
 
 	# Initialize source
 	n = len(C_n)
@@ -11,14 +13,17 @@ def normalize_flow_graph(s: List[int], t: List[int], C: List[List[int]]):
 	else:
 		s_n = n
 		n += 1
-		[row.append(0) for row in C_n]
-		C_n.append([sum(C[v_i]) if v_i in s else 0 for v_i in range(n)])
+		for row in C_n:
+			row.append(0)
+		C_n.append([sum(C_n[v_i]) if v_i in sources else 0 for v_i in range(n)])
 
 	# Initialize sink
 	if len(t) == 1:
 		t_n = t[0]
 	else:
-		[C_n[u_i].append(sum([row[u_i] for row in C_n])) if u_i in t else C_n[u_i].append(0) for u_i in range(n)]
+		into = [sum(column) for column in zip(*C_n)]
+		for (u_i, row) in enumerate(C_n):
+			row.append(into[u_i] if u_i in sinks else 0)
 		t_n = n
 		n += 1
 		C_n.append([0] * n)
@@ -0,0 +1,281 @@
+import multiprocessing
+import os
+from collections import deque
+from multiprocessing import shared_memory
+from typing import Any, Deque, List, Optional, Sequence, Union
+import numpy as np
+from max_flow.CSRGraph import CSRGraph
+from max_flow.TerminalOverlay import TerminalOverlay
+from max_flow import push_relabel
+from max_flow.push_relabel import return_excess, sink_inflow
+
+# Node kinds
+SOURCE = 1
+SINK = 2
+
+# Graphs with fewer nodes are solved serially, as process start-up and the
+# synchronization of every round outweigh what the workers save
+SERIAL_BELOW = 100000
+
+def find_max_flow(s: int, t: int, C: Union[List[List[int]], CSRGraph], processes: Optional[int] = None) -> int:
+	"""
+	Find the maximum flow by synchronous push-relabel across processes.
+
+	Takes the same arguments as push_relabel.find_max_flow, TerminalOverlay
+	included, and leaves CSR graphs holding a valid flow in the same way.
+	processes defaults to the number of cores. With a single process, or
+	fewer than SERIAL_BELOW nodes, push_relabel.find_max_flow solves C
+	instead.
+	"""
+	if (processes or os.cpu_count() or 1) == 1 or len(C) < SERIAL_BELOW:
+		return push_relabel.find_max_flow(s, t, C)
+	if isinstance(C, TerminalOverlay):
+		flow = find_parallel_max_flow(C.graph, C.sources, C.sinks, processes)
+		C.rebalance()
+		return flow
+
+	G = C if isinstance(C, CSRGraph) else CSRGraph.from_matrix(C)
+	return find_parallel_max_flow(G, [s], [t], processes)
+
+class SharedState:
+	"""
+	The graph and solver state of one solve, laid out in a single shared
+	memory block of int64 slots.
+
+	Holds the CSR arrays, residuals, excess, two height buffers that rounds
+	alternate between, node kinds, one inbox row per worker for the excess
+	it pushes into other nodes, and the control slots.
+	"""
+	def __init__(self, n: int, m: int, workers: int, name: Optional[str] = None):
+		self.n = n
+		self.m = m
+		self.workers = workers
+		sizes = [
+			('offsets', n + 1),
+			('heads', m),
+			('pair', m),
+			('residual', m),
+			('excess', n),
+			('height', 2 * n),
+			('kind', n),
+			('inbox', workers * n),
+			('control', 2 * workers),
+		]
+		size = 8 * max(1, sum((k for (_, k) in sizes)))
+		if name is None:
+			self.block = shared_memory.SharedMemory(create=True, size=size)
+		else:
+			self.block = shared_memory.SharedMemory(name=name)
+
+		# Flat memoryviews for scalar access, numpy views for whole ranges
+		view = self.block.buf.cast('q')
+		self.views: List[Any] = [view]
+		start = 0
+		for (field, k) in sizes:
+			setattr(self, field, view[start:start + k])
+			setattr(self, field + '_array', np.frombuffer(self.block.buf, np.int64, k, 8 * start))
+			self.views.append(getattr(self, field))
+			start += k
+		self.height_array = self.height_array.reshape(2, n)
+		self.inbox_array = self.inbox_array.reshape(workers, n)
+
+	def close(self) -> None:
+		"""Releases every view, then the block."""
+		for field in ('offsets', 'heads', 'pair', 'residual', 'excess', 'height', 'kind', 'inbox', 'control'):
+			delattr(self, field + '_array')
+		for view in reversed(self.views):
+			view.release()
+		self.views.clear()
+		self.block.close()
+
+def find_parallel_max_flow(G: CSRGraph, sources: Sequence[int], sinks: Sequence[int], processes: Optional[int] = None) -> int:
+	"""
+	Solves G in place from any of sources to any of sinks, returning the net
+	flow into the sinks, flow already present in G included.
+
+	Nodes are split into one contiguous range per worker, and every round
+	runs in lockstep between two barriers:
+
+	1. Each worker pushes the excess of its active nodes along arcs that are
+	   admissible under the round's heights, resuming each node's scan from
+	   a current arc that is reset on relabels. An arc and its pair are never
+	   both admissible, so every residual slot has a single writer, and
+	   excess pushed into a node is batched in the pushing worker's inbox row.
+	2. Each worker collects its nodes' inbox columns, then relabels the nodes
+	   left with excess into the other height buffer, which the next round
+	   reads. Relabels only read the round's heights, which keeps the
+	   labeling valid however they interleave. Each worker then reports its
+	   active nodes and relabels.
+
+	After the second barrier every worker sums the same reports, so all of
+	them stop together once no node is active. Once a round brings the
+	relabels since the last global relabel to n, the first worker recomputes
+	exact heights by a reverse breadth first search from the sinks while the
+	others wait at a third barrier. The stranded excess is finally returned
+	to the sources serially.
+	"""
+	n = len(G)
+	m = len(G.heads)
+	workers = max(1, min(processes or os.cpu_count() or 1, n))
+	state = SharedState(n, m, workers)
+	try:
+		state.offsets_array[:] = G.offsets
+		state.heads_array[:] = G.heads
+		state.pair_array[:] = G.pair
+		state.residual_array[:] = G.residual
+		for u in sources:
+			state.kind[u] = SOURCE
+		for u in sinks:
+			state.kind[u] = SINK
+
+		# Saturate the arcs leaving the sources
+		R = state.residual
+		for s in sources:
+			for a in range(G.offsets[s], G.offsets[s + 1]):
+				v = G.heads[a]
+				if R[a] and state.kind[v] != SOURCE:
+					state.excess[v] += R[a]
+					R[state.pair[a]] += R[a]
+					R[a] = 0
+		global_relabel(state, 0)
+
+		context = multiprocessing.get_context()
+		barrier = context.Barrier(workers)
+		pool = [
+			context.Process(target=_work, args=(state.block.name, n, m, workers, w, barrier), daemon=True)
+			for w in range(workers)
+		]
+		for process in pool:
+			process.start()
+		for process in pool:
+			process.join()
+		if any((process.exitcode for process in pool)):
+			raise RuntimeError('A push-relabel worker failed')
+
+		G.residual[:] = state.residual_array.tolist()
+		excess = state.excess_array.tolist()
+	finally:
+		state.close()
+		state.block.unlink()
+
+	is_terminal = [False] * n
+	for u in sources:
+		is_terminal[u] = True
+	for u in sinks:
+		is_terminal[u] = True
+	return_excess(G, excess, list(sources), is_terminal)
+	return sink_inflow(G, list(sinks))
+
+def global_relabel(state: SharedState, buffer: int) -> None:
+	"""Resets a height buffer to exact residual distances to the sinks."""
+	n = state.n
+	offsets = state.offsets
+	heads = state.heads
+	pair = state.pair
+	R = state.residual
+	kind = state.kind
+	height = [n] * n
+	queue: Deque[int] = deque()
+	for u in range(n):
+		if kind[u] == SINK:
+			height[u] = 0
+			queue.append(u)
+	while len(queue) > 0:
+		v = queue.popleft()
+		h = height[v] + 1
+		for a in range(offsets[v], offsets[v + 1]):
+			u = heads[a]
+			if height[u] == n and kind[u] != SOURCE and R[pair[a]]:
+				height[u] = h
+				queue.append(u)
+	state.height_array[buffer] = height
+
+def _work(name: str, n: int, m: int, workers: int, w: int, barrier: Any) -> None:
+	"""Runs the rounds of one worker over its range of nodes."""
+	state = SharedState(n, m, workers, name)
+	try:
+		_run_rounds(state, w, barrier)
+	except BaseException:
+		# Wake everyone waiting on this worker rather than leave them hanging
+		barrier.abort()
+		raise
+	finally:
+		state.close()
+
+def _run_rounds(state: SharedState, w: int, barrier: Any) -> None:
+	n = state.n
+	workers = state.workers
+	offsets = state.offsets
+	heads = state.heads
+	pair = state.pair
+	R = state.residual
+	excess = state.excess
+	inbox = state.inbox
+	control = state.control
+	lo = w * n // workers
+	hi = (w + 1) * n // workers
+	row = w * n
+	own_excess = state.excess_array[lo:hi]
+	own_inbox = state.inbox_array[:, lo:hi]
+	own_kind = state.kind_array[lo:hi]
+	buffers = [state.height[:n], state.height[n:]]
+	own_buffers = [state.height_array[0, lo:hi], state.height_array[1, lo:hi]]
+	current = 0 # Height buffer read this round
+	arc = list(offsets[lo:hi]) # Current arc of each node, reset on relabels
+	relabels = 0
+
+	while True:
+		height = buffers[current]
+		next_height = buffers[1 - current]
+		own_height = own_buffers[current]
+
+		# Push along arcs admissible under this round's heights
+		stuck: List[int] = []
+		for u in (lo + np.flatnonzero((own_excess > 0) & (own_height < n) & (own_kind == 0))).tolist():
+			e = excess[u]
+			h = height[u] - 1
+			a = arc[u - lo]
+			end = offsets[u + 1]
+			while a < end:
+				if R[a] and height[heads[a]] == h:
+					d = min(e, R[a])
+					R[a] -= d
+					R[pair[a]] += d
+					inbox[row + heads[a]] += d
+					e -= d
+					if e == 0:
+						break
+				a += 1
+			excess[u] = e
+			if e:
+				stuck.append(u)
+				a = offsets[u]
+			arc[u - lo] = a
+		barrier.wait() # Pushes done
+
+		# Collect pushed excess and relabel nodes that could not spend theirs
+		own_excess += own_inbox.sum(axis=0)
+		own_inbox.fill(0)
+		own_next_height = own_buffers[1 - current]
+		own_next_height[:] = own_height
+		for u in stuck:
+			h = 2 * n
+			for a in range(offsets[u], offsets[u + 1]):
+				if R[a] and height[heads[a]] < h:
+					h = height[heads[a]]
+			next_height[u] = min(h + 1, n)
+		control[2 * w] = int(np.count_nonzero((own_excess > 0) & (own_next_height < n) & (own_kind == 0)))
+		control[2 * w + 1] = len(stuck)
+		barrier.wait() # Round done
+
+		# Every worker reads the same reports, so all decide alike
+		if sum(control[0::2]) == 0:
+			return
+		relabels += sum(control[1::2])
+		current = 1 - current
+		if relabels >= n:
+			if w == 0:
+				global_relabel(state, current)
+			relabels = 0
+			arc[:] = offsets[lo:hi]
+			barrier.wait() # Heights recomputed
@@ -0,0 +1,237 @@
+from collections import deque
+from typing import Deque, List, Set, Union
+from max_flow.CSRGraph import CSRGraph
+from max_flow.TerminalOverlay import TerminalOverlay
+
+def find_max_flow(s: int, t: int, C: Union[List[List[int]], CSRGraph]) -> int:
+	"""
+	Find the maximum flow in a single-source, single-sink network by
+	push-relabel.
+
+	Active nodes are discharged highest label first from height buckets, each
+	node resumes its arc scan from a current-arc pointer, heights are
+	periodically recomputed by a reverse breadth first search from the sink and
+	nodes above an emptied height are lifted out of play by the gap heuristic.
+	CSR graphs are solved in place and left holding a valid flow. A
+	TerminalOverlay is solved directly on its underlying graph, with its
+	sources and sinks standing in for s and t.
+	"""
+	if isinstance(C, TerminalOverlay):
+		flow = find_multi_max_flow(C.graph, C.sources, C.sinks)
+		C.rebalance()
+		return flow
+
+	G = C if isinstance(C, CSRGraph) else CSRGraph.from_matrix(C)
+	return find_multi_max_flow(G, [s], [t])
+
+def find_multi_max_flow(G: CSRGraph, sources: List[int], sinks: List[int]) -> int:
+	"""
+	Solves G in place from any of sources to any of sinks, returning the net
+	flow into the sinks. Like rework.find_max_flow, flow already present in
+	G's residuals is kept, augmented and counted.
+	"""
+	n = len(G)
+	offsets = G.offsets
+	heads = G.heads
+	pair = G.pair
+	R = G.residual
+
+	height = [0] * n
+	excess = [0] * n
+	current = list(offsets[:n]) # Current arc of each node
+	active: List[List[int]] = [[] for i in range(n)] # Active nodes by height
+	members: List[Set[int]] = [set() for i in range(n)] # All nodes by height
+	highest = 0
+	relabels = 0
+	is_source = [False] * n
+	is_terminal = [False] * n
+	for u in sources:
+		is_source[u] = is_terminal[u] = True
+	for u in sinks:
+		is_terminal[u] = True
+
+	""" UTILITY FUNCTIONS """
+	def push(u: int, a: int) -> None:
+		"""Pushes as much of u's excess as fits along an arc."""
+		nonlocal highest
+		v = heads[a]
+		d = min(excess[u], R[a])
+		R[a] -= d
+		R[pair[a]] += d
+		excess[u] -= d
+		if excess[v] == 0 and not is_terminal[v]:
+			h = height[v]
+			active[h].append(v)
+			if h > highest:
+				highest = h
+		excess[v] += d
+
+	def global_relabel() -> None:
+		"""Resets heights to exact residual distances to the sink."""
+		nonlocal highest, relabels
+		relabels = 0
+		for u in range(n):
+			height[u] = n
+			current[u] = offsets[u]
+		for bucket in active:
+			bucket.clear()
+		for nodes in members:
+			nodes.clear()
+
+		for t in sinks:
+			height[t] = 0
+			members[0].add(t)
+		queue: Deque[int] = deque(sinks)
+		while len(queue) > 0:
+			v = queue.popleft()
+			h = height[v] + 1
+			for a in range(offsets[v], offsets[v + 1]):
+				u = heads[a]
+				if height[u] == n and not is_source[u] and R[pair[a]]:
+					height[u] = h
+					members[h].add(u)
+					queue.append(u)
+
+		highest = 0
+		for u in range(n):
+			h = height[u]
+			if excess[u] and h < n and not is_terminal[u]:
+				active[h].append(u)
+				if h > highest:
+					highest = h
+
+	def relabel(u: int) -> None:
+		"""Lifts u above its lowest residual neighbour, closing any gap left behind."""
+		nonlocal relabels
+		relabels += 1
+		old = height[u]
+		members[old].discard(u)
+		if len(members[old]) == 0:
+			# Gap: nothing above old can reach the sink anymore
+			for h in range(old + 1, n):
+				for v in members[h]:
+					height[v] = n
+				members[h].clear()
+			height[u] = n
+			return
+
+		h = 2 * n
+		for a in range(offsets[u], offsets[u + 1]):
+			if R[a] and height[heads[a]] < h:
+				h = height[heads[a]]
+		h += 1
+		if h < n:
+			members[h].add(u)
+			current[u] = offsets[u]
+		else:
+			h = n
+		height[u] = h
+
+	def discharge(u: int) -> None:
+		"""Pushes out u's excess, relabeling until it is spent or u leaves play."""
+		end = offsets[u + 1]
+		while excess[u] > 0:
+			a = current[u]
+			if a == end:
+				relabel(u)
+				if height[u] >= n:
+					return
+				continue
+
+			h = height[u]
+			if R[a] and h == height[heads[a]] + 1:
+				push(u, a)
+			else:
+				current[u] = a + 1
+
+	"""
+	PHASE 1:
+
+	Compute a maximum preflow. Only nodes below height n can still reach the
+	sink, so only they are ever active.
+	"""
+	for s in sources:
+		height[s] = n
+	for s in sources:
+		excess[s] += sum((R[a] for a in range(offsets[s], offsets[s + 1])))
+		for a in range(offsets[s], offsets[s + 1]):
+			if R[a] and not is_source[heads[a]]:
+				push(s, a)
+	for s in sources:
+		excess[s] = 0
+	global_relabel()
+
+	while highest >= 0:
+		bucket = active[highest]
+		if len(bucket) == 0:
+			highest -= 1
+			continue
+
+		u = bucket.pop()
+		if height[u] == highest and excess[u] > 0:
+			discharge(u)
+		if relabels >= n:
+			global_relabel()
+
+	"""
+	PHASE 2:
+
+	Return the excess stranded above the gap to the sources.
+	"""
+	return_excess(G, excess, sources, is_terminal)
+	return sink_inflow(G, sinks)
+
+def sink_inflow(G: CSRGraph, sinks: List[int]) -> int:
+	"""Net flow into the sinks along G's arcs."""
+	return -sum((G.flow(a) for t in sinks for a in G.arcs(t)))
+
+def return_excess(G: CSRGraph, excess: List[int], sources: List[int], is_terminal: List[bool]) -> None:
+	"""
+	Turns a maximum preflow into a flow by sending the excess of every
+	non-terminal node back to the sources, cancelling the flow that brought
+	it so that no source takes in flow. Heights become distances to a source
+	along arcs opposite to flow.
+	"""
+	n = len(G)
+	offsets = G.offsets
+	heads = G.heads
+	pair = G.pair
+	capacity = G.capacity
+	R = G.residual
+
+	height = [2 * n] * n
+	for s in sources:
+		height[s] = 0
+	queue: Deque[int] = deque(sources)
+	while len(queue) > 0:
+		v = queue.popleft()
+		h = height[v] + 1
+		for a in range(offsets[v], offsets[v + 1]):
+			u = heads[a]
+			b = pair[a]
+			if height[u] == 2 * n and R[b] > capacity[b]:
+				height[u] = h
+				queue.append(u)
+
+	stranded = deque(u for u in range(n) if excess[u] > 0 and not is_terminal[u])
+	while len(stranded) > 0:
+		u = stranded.popleft()
+		while excess[u] > 0:
+			h = None
+			for a in range(offsets[u], offsets[u + 1]):
+				if R[a] > capacity[a]:
+					v = heads[a]
+					if height[u] == height[v] + 1:
+						if excess[v] == 0 and not is_terminal[v]:
+							stranded.append(v)
+						d = min(excess[u], R[a] - capacity[a])
+						R[a] -= d
+						R[pair[a]] += d
+						excess[u] -= d
+						excess[v] += d
+						if excess[u] == 0:
+							break
+					elif h is None or height[v] < h:
+						h = height[v]
+			if excess[u] > 0 and h is not None:
+				height[u] = h + 1
@@ -0,0 +1,236 @@
+from collections import deque
+from typing import Deque, Dict, Iterator, List, Set, Tuple, Union
+from max_flow.CSRGraph import CSRGraph
+from max_flow.FlowResult import FlowResult
+
+NONE = -1
+
+Edge = Tuple[int, int, int]
+# (flow, source side, saturated edges crossing the cut)
+FlowWithCut = Tuple[int, Set[int], List[Tuple[int, int]]]
+
+class Reduction:
+	"""
+	A flow network reduced for solving, and the mapping back to the original.
+
+	graph is the reduced CSRGraph with terminals s and t, and nodes[u] the
+	original node behind its node u. Each reduced edge stands for a part: an
+	original edge, a bundle of parallel parts whose capacities add up, or two
+	parts in series through a degree-2 node taking the smaller capacity. Parts
+	0 through len(edges) - 1 are the original edges.
+	"""
+	def __init__(self, n: int, s: int, t: int, edges: List[Edge]):
+		self.n = n
+		self.original_s = s
+		self.original_t = t
+		self.edges = edges
+		self.capacity = [c for (_, _, c) in edges] # Capacity of each part
+		self.parts: List[List[int]] = [[] for e in edges] # Parts making up each part
+		self.middle = [NONE] * len(edges) # Node joining the two parts of a series part
+		self.loops: List[Tuple[int, int]] = [] # (node, part) of dropped cycles through a chain
+		self.reaches_t = [False] * n
+		self.s = 0
+		self.t = 0
+		self.nodes: List[int] = []
+		self.part_of: Dict[Tuple[int, int], int] = {} # Part behind each reduced edge
+		self.graph = CSRGraph(0, [])
+
+	def parallel(self, a: int, b: int) -> int:
+		"""Bundles two parts running between the same pair of nodes."""
+		if len(self.parts[a]) == 0 or self.middle[a] != NONE:
+			a = self.add_part([a], NONE, self.capacity[a])
+		self.parts[a].append(b)
+		self.capacity[a] += self.capacity[b]
+		return a
+
+	def series(self, a: int, x: int, b: int) -> int:
+		"""Chains part a into node x with part b out of it."""
+		return self.add_part([a, b], x, min(self.capacity[a], self.capacity[b]))
+
+	def add_part(self, parts: List[int], middle: int, c: int) -> int:
+		self.parts.append(parts)
+		self.middle.append(middle)
+		self.capacity.append(c)
+		return len(self.capacity) - 1
+
+	def lift_flow(self, G: CSRGraph) -> FlowResult:
+		"""
+		Carries the flow of the solved reduced graph back to the original edges.
+
+		A series part passes its flow to both of its parts, and a bundle fills
+		its parts one after another.
+		"""
+		flows = [0] * len(self.edges)
+		stack: List[Tuple[int, int]] = []
+		for u in range(len(G)):
+			for a in G.arcs(u):
+				if G.capacity[a] and (f := G.flow(a)) > 0:
+					stack.append((self.part_of[(u, G.heads[a])], f))
+		while len(stack) > 0:
+			(part, f) = stack.pop()
+			if len(self.parts[part]) == 0:
+				flows[part] = f
+			elif self.middle[part] != NONE:
+				stack.extend(((c, f) for c in self.parts[part]))
+			else:
+				for c in self.parts[part]:
+					d = min(f, self.capacity[c])
+					stack.append((c, d))
+					f -= d
+
+		value = sum((G.flow(a) for a in G.arcs(self.s)))
+		used = [i for i in range(len(flows)) if flows[i] > 0]
+		return FlowResult(
+			self.original_s,
+			self.original_t,
+			self.n,
+			value,
+			[self.edges[i][0] for i in used],
+			[self.edges[i][1] for i in used],
+			[flows[i] for i in used]
+		)
+
+	def lift_cut(self, result: FlowWithCut) -> FlowWithCut:
+		"""
+		Carries a minimum cut of the reduced graph back to the original.
+
+		Nodes that cannot reach t join the source side and other pruned nodes
+		the sink side. A chain crossing the cut is cut at its bottleneck.
+		"""
+		(flow, side, _) = result
+		source_side = {self.nodes[u] for u in side}
+		source_side.update((u for u in range(self.n) if not self.reaches_t[u]))
+
+		def place(part: int, tail_in: bool, head_in: bool) -> None:
+			"""Sides the nodes inside a part given the sides of its ends."""
+			stack = [(part, tail_in, head_in)]
+			while len(stack) > 0:
+				(part, tail_in, head_in) = stack.pop()
+				parts = self.parts[part]
+				if self.middle[part] == NONE:
+					stack.extend(((c, tail_in, head_in) for c in parts))
+					continue
+
+				# Cut a crossing chain on the side of its bottleneck
+				(a, b) = parts
+				if tail_in and not head_in:
+					x_in = self.capacity[a] > self.capacity[b]
+				else:
+					x_in = tail_in and head_in
+				if x_in:
+					source_side.add(self.middle[part])
+				stack.append((a, tail_in, x_in))
+				stack.append((b, x_in, head_in))
+
+		for ((u, v), part) in self.part_of.items():
+			place(part, u in side, v in side)
+		# Later cycles hang from nodes inside earlier ones, so go latest first
+		for (u, part) in reversed(self.loops):
+			place(part, u in source_side, u in source_side)
+
+		cut_edges = [(u, v) for (u, v, _) in self.edges if u in source_side and v not in source_side]
+		return (flow, source_side, cut_edges)
+
+def original_edges(C: Union[List[List[int]], CSRGraph]) -> Iterator[Edge]:
+	"""The capacitated edges of a dense or CSR network."""
+	if isinstance(C, CSRGraph):
+		for u in range(len(C)):
+			for a in C.arcs(u):
+				if C.capacity[a]:
+					yield (u, C.heads[a], C.capacity[a])
+	else:
+		for (u, row) in enumerate(C):
+			for (v, c) in enumerate(row):
+				if c:
+					yield (u, v, c)
+
+def reduce_flow_graph(s: int, t: int, C: Union[List[List[int]], CSRGraph]) -> Reduction:
+	"""
+	Reduces a network to an equivalent smaller one in linear time.
+
+	Nodes not on any path from s to t are pruned along with edges into s, out
+	of t and self-loops. Parallel edges are merged, and every node left with a
+	single edge in and a single edge out is contracted into one edge of their
+	bottleneck capacity, which may in turn merge with a parallel edge and
+	expose further such nodes. The reduced graph has the same maximum flow,
+	and the returned Reduction lifts its flows and cuts back to C.
+	"""
+	n = len(C)
+	R = Reduction(n, s, t, list(original_edges(C)))
+	edges = R.edges
+	exits: List[List[int]] = [[] for u in range(n)]
+	entrances: List[List[int]] = [[] for u in range(n)]
+	for (i, (u, v, c)) in enumerate(edges):
+		exits[u].append(v)
+		entrances[v].append(u)
+
+	# Mark the nodes reachable from s and those reaching t, without passing
+	# through the other terminal
+	def search(start: int, stop: int, adjacent: List[List[int]]) -> List[bool]:
+		reached = [False] * n
+		reached[start] = True
+		queue: Deque[int] = deque([start])
+		while len(queue) > 0:
+			u = queue.popleft()
+			if u == stop:
+				continue
+			for v in adjacent[u]:
+				if not reached[v]:
+					reached[v] = True
+					queue.append(v)
+		return reached
+
+	from_s = search(s, t, exits)
+	R.reaches_t = to_t = search(t, s, entrances)
+	live = [from_s[u] and to_t[u] for u in range(n)]
+
+	# Live edges, merged by their endpoints
+	out: List[Dict[int, int]] = [{} for u in range(n)]
+	into: List[Dict[int, int]] = [{} for u in range(n)]
+
+	def add_edge(u: int, v: int, part: int) -> bool:
+		"""Adds a part from u to v, returning whether it merged into another."""
+		existing = out[u].get(v)
+		if existing is not None:
+			part = R.parallel(existing, part)
+		out[u][v] = into[v][u] = part
+		return existing is not None
+
+	for (i, (u, v, c)) in enumerate(edges):
+		if live[u] and live[v] and u != v and u != t and v != s:
+			add_edge(u, v, i)
+
+	# Contract series nodes until none are left
+	pending = [u for u in range(n) if live[u] and u != s and u != t]
+	while len(pending) > 0:
+		x = pending.pop()
+		if x == s or x == t or not live[x] or len(into[x]) != 1 or len(out[x]) != 1:
+			continue
+		((u, a),) = into[x].items()
+		((v, b),) = out[x].items()
+		live[x] = False
+		out[x].clear()
+		into[x].clear()
+		del out[u][x]
+		del into[v][x]
+		part = R.series(a, x, b)
+		if u == v:
+			# A cycle back to u can carry no flow from s to t
+			R.loops.append((u, part))
+			pending.append(u)
+		elif add_edge(u, v, part):
+			pending.append(u)
+			pending.append(v)
+
+	live[s] = live[t] = True
+	R.nodes = [u for u in range(n) if live[u]]
+	index = {u: i for (i, u) in enumerate(R.nodes)}
+	R.s = index[s]
+	R.t = index[t]
+	reduced_edges = []
+	for u in R.nodes:
+		for (v, part) in out[u].items():
+			R.part_of[(index[u], index[v])] = part
+			reduced_edges.append((index[u], index[v], R.capacity[part]))
+	R.graph = CSRGraph(len(R.nodes), reduced_edges)
+	return R
@@ -1,26 +1,92 @@
-from typing import List, Literal, Optional, Tuple, Set, Callable
-from max_flow.PathTreeRework import PathTree
-from util.data_structures.is_node import is_node
+from time import perf_counter
+from typing import Any, Iterable, Iterator, List, Literal, Optional, Tuple, Set, Callable, Union
+from max_flow.CSRGraph import CSRGraph
+from max_flow.LinkCutForest import LinkCutForest
+from max_flow.PathTreeRework import PathTreeForest
+from max_flow.instrumentation import SolveStats
+from max_flow.unit_capacity import find_unit_max_flow, is_unit_capacity
+try:
+	import numpy as np
+except ImportError:
+	np = None
 
-Edge = Tuple[int, int, bool]
+# (head, residual, key) where key is the is-reverse flag for dense matrices and
+# the arc index for CSR graphs
+Edge = Tuple[int, int, int]
 LevelGraph = List[List[Edge]]
+# (flow, source side, saturated edges crossing the cut)
+FlowWithCut = Tuple[int, Set[int], List[Tuple[int, int]]]
+# (flow so far, depth of the level graph just solved)
+Phase = Tuple[int, int]
+ForestFactory = Callable[[int], Union[PathTreeForest, LinkCutForest]]
 
-def find_max_flow(s: int, t: int, C: List[List[int]]) -> int:
-	"""Find the maximum flow possible in a single-source, single-sink network."""
+def find_max_flow(
+		s: int,
+		t: int,
+		C: Union[List[List[int]], CSRGraph],
+		make_forest: ForestFactory = PathTreeForest,
+		cut: bool = False,
+		stats: Optional[SolveStats] = None,
+		scaling: bool = False,
+		stop_at: Optional[int] = None
+	) -> Union[int, FlowWithCut]:
+	"""
+	Find the maximum flow possible in a single-source, single-sink network.
+
+	make_forest selects the dynamic-tree engine used by each blocking flow,
+	either PathTreeForest or the array-backed LinkCutForest. With cut set, the
+	minimum cut is returned alongside the flow, read off the nodes reached by
+	the final level graph construction. Passing stats collects phase, step
+	and dynamic tree counters into it.
+
+	With scaling set, level graphs only admit residuals of at least Δ, which
+	starts at the largest power of two not above the largest capacity and is
+	halved whenever no path remains, down to 1. Under widely spread capacities
+	this takes fewer phases, each moving more flow through fewer tree edges.
+
+	With stop_at set, the solve ends after the first phase that brings the
+	flow to at least stop_at and returns the flow reached so far, which
+	answers whether stop_at units can be routed without finishing the solve.
+	A cut needs the solve to finish, so cut and stop_at cannot be combined.
+
+	Dense capacities, given as nested lists or a NumPy array, are held with
+	the residuals in contiguous NumPy arrays of int32, or of int64 when a
+	capacity needs it, and each node's row is scanned with array operations
+	when its level is built, against a mask of the nodes still open on the
+	next level. Only when NumPy is missing or a capacity needs more than 63
+	bits are they held as lists of Python ints instead.
+
+	Networks whose capacities are all 0 or 1 are handed to
+	unit_capacity.find_unit_max_flow, which needs no dynamic trees, unless
+	stats, scaling, stop_at or a make_forest other than the default is given.
+	"""
+	if cut and stop_at is not None:
+		raise ValueError('A cut needs the solve to run to completion')
+	if stats is None and make_forest is PathTreeForest and not scaling and stop_at is None and is_unit_capacity(C):
+		return find_unit_max_flow(s, t, C, cut)[0]
+	if isinstance(C, CSRGraph):
+		return find_sparse_max_flow(s, t, C, make_forest, cut, stats, scaling, stop_at)
 
 	# Initialize residuals matrix
 	n = len(C)
-	R = [[C[i][j] for j in range(n)] for i in range(n)] # Residual capacity matrix
+	dense = capacity_array(C)
+	if dense is not None:
+		C = dense.reshape(n, n)
+		R = C.copy() # Residual capacity matrix
+		level_array = np.full(n, -1, dtype=np.int64) # level_of, -1 for None
+		level_array[s] = 0
+	else:
+		R = [[C[i][j] for j in range(n)] for i in range(n)]
 
 	# Initialize level graph
 	exits: LevelGraph = [[] for i in range(n)]
-	entrances: List[List[int]] = [[] for i in range(n)]
 	level_of: List[Optional[int]] = [None for i in range(n)]
 	levels: List[Set[int]] = [set() for i in range(n)]
 	levels[0].add(s)
 	level_of[s] = 0
 	i = 0 # Current level
 	ii = 1 # Next level
+	delta = initial_delta(int(max((max(row, default=0) for row in C), default=0))) if scaling else 1
 
 	""" UTILITY FUNCTIONS """
 	def F(u: int, v: int) -> int:
@@ -37,11 +103,6 @@ def find_max_flow(s: int, t: int, C: List[List[int]]) -> int:
 		levels[i].add(u)
 		return True
 
-	def set_entrance(u: int, v: int) -> Literal[True]:
-		"""Update the entrance list for a node v based on the edge (u, v)."""
-		entrances[v].append(u)
-		return True
-
 	def update_edge(u: int, uv: Edge, d: int) -> None:
 		"""Update the flow along an edge."""
 		v = uv[0]
@@ -53,7 +114,7 @@ def find_max_flow(s: int, t: int, C: List[List[int]]) -> int:
 
 	def has_capacity(u: int, v: int) -> int:
 		"""Returns capacity of an edge, prioritizing outgoing capacity."""
-		return R[u][v] or (R[v][u] and F(v, u))
+		return R[u][v] or F(v, u)
 
 	def is_reverse(u: int, v: int) -> bool:
 		"""Checks whether an edge traverses backwards."""
@@ -64,32 +125,65 @@ def find_max_flow(s: int, t: int, C: List[List[int]]) -> int:
 
 	Construct and solve level graphs until no path exists from source to
 	sink. We recognize this is the case when we construct a level containing
-	no nodes before we construct a level containing the sink.
+	no nodes before we construct a level containing the sink, at Δ = 1 when
+	scaling.
 	"""
-	while len(levels[i]) > 0:
+	if stats is not None:
+		make_forest = stats.instrument(make_forest)
+		clock = perf_counter()
+	while len(levels[i]) > 0 or delta > 1:
+		if len(levels[i]) == 0:
+			# No path left at this scale, so admit smaller residuals
+			delta //= 2
+			for level in levels:
+				level.clear()
+			for exit in exits:
+				exit.clear()
+			level_of = [None for i in range(n)]
+			level_of[s] = 0
+			if dense is not None:
+				level_array.fill(-1)
+				level_array[s] = 0
+			levels[0].add(s)
+			i = 0
+			ii = 1
+			continue
+
 		# Construct the next level
-		for u in levels[i]:
-			exits[u] = [
+		if dense is not None:
+			for v in expand_dense_level(levels[i], level_array, ii, C, R, exits, delta):
 				set_level_of(v, ii)
-				and set_entrance(u, v)
-				and (v, c, is_reverse(u, v))
-				for v in range(n)
-				if is_on_level(v, ii)
-				and (c := has_capacity(u, v))
-			]
+		else:
+			for u in levels[i]:
+				exits[u] = [
+					set_level_of(v, ii)
+					and (v, c, is_reverse(u, v))
+					for v in range(n)
+					if is_on_level(v, ii)
+					and (c := has_capacity(u, v)) >= delta
+				]
 
 		if level_of[t] == ii:
 			# Solve the level graph by sending a blocking flow along it
-			send_blocking_flow(s, t, exits, entrances, update_edge)
+			if stats is not None:
+				clock = stats.level_graph_built(ii, level_of, exits, clock)
+			send_blocking_flow(s, t, exits, update_edge, make_forest, stats)
+			if stats is not None:
+				clock = stats.blocking_flow_sent(clock)
+			if stop_at is not None and sum((int(F(s, v)) for v in range(n))) >= stop_at:
+				break
 
 			# Reset the level graph
 			for level in levels:
 				level.clear()
-			for entrance in entrances:
-				entrance.clear()
-			# Exits are overwritten, and so don't need to be cleared
+			# Nodes left unexpanded would otherwise keep stale exits
+			for exit in exits:
+				exit.clear()
 			level_of = [None for i in range(n)]
 			level_of[s] = 0
+			if dense is not None:
+				level_array.fill(-1)
+				level_array[s] = 0
 			levels[0].add(s)
 			i = 0
 			ii = 1
@@ -97,93 +191,341 @@ def find_max_flow(s: int, t: int, C: List[List[int]]) -> int:
 			i = ii
 			ii += 1
 
+	if stats is not None:
+		stats.finished(clock)
+
 	# Sum and return flow
-	return sum((F(s, v) for v in range(n)))
+	flow = sum((int(F(s, v)) for v in range(n)))
+	if not cut:
+		return flow
+
+	# The failed level graph construction reached exactly the source side
+	source_side = {u for u in range(n) if level_of[u] is not None}
+	cut_edges = [
+		(u, v)
+		for u in source_side
+		for v in range(n)
+		if C[u][v] and level_of[v] is None
+	]
+	return (flow, source_side, cut_edges)
+
+def find_sparse_max_flow(
+		s: int,
+		t: int,
+		G: CSRGraph,
+		make_forest: ForestFactory = PathTreeForest,
+		cut: bool = False,
+		stats: Optional[SolveStats] = None,
+		scaling: bool = False,
+		stop_at: Optional[int] = None
+	) -> Union[int, FlowWithCut]:
+	"""
+	Find the maximum flow in a CSR network, leaving the flow in G's residuals.
+
+	Each level graph is built by scanning the arcs of each reached node once,
+	so a phase costs O(n + m) outside of the blocking flow itself. Any graph
+	exposing CSRGraph's arcs, heads, residual, flow and update_edge will do,
+	and flow already present in its residuals is kept and augmented. scaling
+	and stop_at work as for find_max_flow, with Δ taken from the largest
+	residual.
+	"""
+	if cut and stop_at is not None:
+		raise ValueError('A cut needs the solve to run to completion')
+	n = len(G)
+	level_of: List[Optional[int]] = [None] * n
+	for phase in send_phases(s, t, G, make_forest, level_of, stats, scaling, stop_at):
+		pass
+
+	# Net flow out of the source
+	flow = sum((G.flow(a) for a in G.arcs(s)))
+	if not cut:
+		return flow
+
+	# The failed level graph construction reached exactly the source side
+	arcs = G.arcs
+	heads = G.heads
+	capacity = G.capacity
+	source_side = {u for u in range(n) if level_of[u] is not None}
+	cut_edges = [
+		(u, heads[a])
+		for u in source_side
+		for a in arcs(u)
+		if capacity[a] and level_of[heads[a]] is None
+	]
+	return (flow, source_side, cut_edges)
+
+def iterate_max_flow(
+		s: int,
+		t: int,
+		C: Union[List[List[int]], CSRGraph],
+		make_forest: ForestFactory = PathTreeForest,
+		scaling: bool = False,
+		stop_at: Optional[int] = None
+	) -> Iterator[Phase]:
+	"""
+	Runs Dinic's algorithm one phase at a time, yielding the flow so far and
+	the depth of the level graph after every blocking flow.
+
+	The flow is found as by find_sparse_max_flow, in place for CSR graphs.
+	Iteration ends once no path is left, or after the first phase to bring
+	the flow to at least stop_at. Dropping the iterator early leaves a valid,
+	partial flow.
+	"""
+	G = C if isinstance(C, CSRGraph) else CSRGraph.from_matrix(C)
+	return send_phases(s, t, G, make_forest, [None] * len(G), None, scaling, stop_at)
+
+def send_phases(
+		s: int,
+		t: int,
+		G: CSRGraph,
+		make_forest: ForestFactory,
+		level_of: List[Optional[int]],
+		stats: Optional[SolveStats],
+		scaling: bool,
+		stop_at: Optional[int]
+	) -> Iterator[Phase]:
+	"""
+	Main loop of find_sparse_max_flow, yielding after every blocking flow.
+
+	level_of is updated in place and holds the levels of the last level graph
+	construction once iteration ends, which mark the source side of a minimum
+	cut when no path is left.
+	"""
+	n = len(G)
+	arcs = G.arcs
+	heads = G.heads
+	R = G.residual
+
+	exits: LevelGraph = [[] for i in range(n)]
+	level_of[:] = [None] * n
+	level_of[s] = 0
+	level = [s]
+	ii = 1 # Next level
+	delta = initial_delta(max(R, default=0)) if scaling else 1
+	flow = sum((G.flow(a) for a in arcs(s)))
+
+	if stats is not None:
+		make_forest = stats.instrument(make_forest)
+		clock = perf_counter()
+	while (len(level) > 0 or delta > 1) and (stop_at is None or flow < stop_at):
+		if len(level) == 0:
+			# No path left at this scale, so admit smaller residuals
+			delta //= 2
+			for exit in exits:
+				exit.clear()
+			level_of[:] = [None] * n
+			level_of[s] = 0
+			level = [s]
+			ii = 1
+			continue
+
+		# Construct the next level
+		next_level: List[int] = []
+		for u in level:
+			exit = exits[u]
+			for a in arcs(u):
+				c = R[a]
+				if c >= delta:
+					v = heads[a]
+					v_level = level_of[v]
+					if v_level is None:
+						level_of[v] = ii
+						next_level.append(v)
+					elif v_level != ii:
+						continue
+					exit.append((v, c, a))
+
+		if level_of[t] == ii:
+			# Solve the level graph by sending a blocking flow along it
+			if stats is not None:
+				clock = stats.level_graph_built(ii, level_of, exits, clock)
+			send_blocking_flow(s, t, exits, G.update_edge, make_forest, stats)
+			if stats is not None:
+				clock = stats.blocking_flow_sent(clock)
+			flow = sum((G.flow(a) for a in arcs(s)))
+			yield (flow, ii)
+
+			# Reset the level graph
+			for exit in exits:
+				exit.clear()
+			level_of[:] = [None] * n
+			level_of[s] = 0
+			level = [s]
+			ii = 1
+		else:
+			level = next_level
+			ii += 1
+
+	if stats is not None:
+		stats.finished(clock)
+
+def capacity_array(C: Union[List[List[int]], Any]) -> Any:
+	"""
+	Dense capacities as an array of the narrowest of int32 and int64 that
+	holds each of them, or None when NumPy is missing or a capacity needs
+	more than 63 bits, which Python ints are left to handle. Residuals never
+	exceed their edge's capacity and flows are summed as Python ints, so the
+	largest and smallest capacities decide.
+	"""
+	if np is None:
+		return None
+	A = np.asarray(C)
+	if A.dtype.kind not in 'biu':
+		# Python ints beyond 64 bits, or non-integer capacities
+		return None
+	if A.size == 0:
+		return A.astype(np.int32)
+	(smallest, largest) = (int(A.min()), int(A.max()))
+	if largest >= 1 << 63:
+		return None
+	dtype = np.int32 if -(1 << 31) <= smallest and largest < 1 << 31 else np.int64
+	return np.ascontiguousarray(A, dtype=dtype)
+
+def expand_dense_level(
+		level: Iterable[int],
+		level_of: Any,
+		ii: int,
+		C: Any,
+		R: Any,
+		exits: LevelGraph,
+		delta: int = 1
+	) -> List[int]:
+	"""
+	Builds the exits of a level of a dense level graph, held in NumPy
+	arrays, and marks the nodes they reach as level ii in level_of, where -1
+	stands for unreached. Returns the nodes newly reached.
+
+	Capacities follow has_capacity and is_reverse: outgoing residual
+	capacity first, otherwise the flow that could be sent back along the
+	opposite edge. Only those of at least delta are admitted. Each node's
+	row is scanned in turn against a mask of the nodes still open on level
+	ii, so no scratch array grows beyond n entries.
+	"""
+	open_nodes = (level_of == -1) | (level_of == ii)
+	reached: List[int] = []
+	for u in level:
+		forward = R[u]
+		capacity = np.where(forward > 0, forward, C[:, u] - R[:, u])
+		heads = np.flatnonzero(open_nodes & (capacity >= delta))
+		reached.extend(heads[level_of[heads] == -1].tolist())
+		level_of[heads] = ii
+		exits[u] = list(zip(
+			heads.tolist(),
+			capacity[heads].tolist(),
+			(forward[heads] == 0).tolist()
+		))
+	return reached
+
+def initial_delta(capacity: int) -> int:
+	"""Largest power of two not above capacity, or 1."""
+	return 1 << max(capacity.bit_length() - 1, 0)
 
 def send_blocking_flow(
-		s_i: int,
-		t_i: int,
+		s: int,
+		t: int,
 		exits: LevelGraph,
-		entrances: List[List[int]],
-		update_edge: Callable[[int, Edge, int], None]
+		update_edge: Callable[[int, Edge, int], None],
+		make_forest: ForestFactory = PathTreeForest,
+		stats: Optional[SolveStats] = None
 	) -> None:
 	"""
 	Finds and sends a blocking flow along a level graph.
 
 	A blocking flow is both the maximum possible flow in a level graph and one
 	that eliminates all possible paths from source to sink.
+
+	The level graph's edges are numbered node by node, and removal only marks
+	an edge dead. Each node advances through a current-arc pointer, each tree
+	edge is remembered by number and each node keeps the numbers of the edges
+	entering it, so advances, removals and retreats are all O(1) amortized.
 	"""
-	# HIGH = 20000000
 	n = len(exits)
-	forest = [PathTree(i) for i in range(n)]
-	s = forest[s_i]
-	t = forest[t_i]
-	# t.add_cost(HIGH)
+	forest = make_forest(n)
+	advances = augments = retreats = 0
 
-	def find_edge(u: int, v: Optional[int] = None) -> Optional[Edge]:
-		if v is not None:
-			return next(filter(lambda ux: ux[0] == v, exits[u]), None)
-		elif len(exits[u]) > 0:
-			return exits[u][-1]
-
-	def remove_edge(u: PathTree, v: PathTree, d: Optional[int] = None):
-		uv = find_edge(u.label, v.label)
-		if uv is None:
-			raise RuntimeError('Tree edge lacks corresponding graph edge')
+	# Edge numbering: node u's exits are first[u]..first[u + 1] - 1
+	first = [0] * (n + 1)
+	for u in range(n):
+		first[u + 1] = first[u] + len(exits[u])
+	tails = [u for u in range(n) for _ in exits[u]]
+	into: List[List[int]] = [[] for i in range(n)] # Edges entering each node
+	for (e, u) in enumerate(tails):
+		into[exits[u][e - first[u]][0]].append(e)
+	dead = bytearray(first[n])
+	current = [first[u + 1] - 1 for u in range(n)] # Current arc, scanned downward
+	linked = [-1] * n # Edge each node is linked to its next node through
+
+	def find_edge(u: int) -> int:
+		"""Current arc of u, or -1 once u has no live exits."""
+		e = current[u]
+		lo = first[u]
+		while e >= lo and dead[e]:
+			e -= 1
+		current[u] = e
+		return e if e >= lo else -1
+
+	def remove_edge(e: int, d: Optional[int] = None) -> None:
+		u = tails[e]
+		dead[e] = 1
 		if d is not None:
-			update_edge(u.label, uv, d)
-		exits[u.label].remove(uv)
-		entrances[v.label].remove(u.label)
-
-	def remove_saturated_edge(u):
-		d = u.find_cost()
-		v = u.next_in_path
-		u.cut()
-		if is_node(v):
-			remove_edge(u, v, d)
-		elif u is s:
-			return v
+			update_edge(u, exits[u][e - first[u]], d)
+
+	def remove_saturated_edge(u: int) -> Optional[int]:
+		d = forest.find_cost(u)
+		v = forest.next_in_path(u)
+		forest.cut(u)
+		if v is not None:
+			remove_edge(linked[u], d)
+		elif u == s:
+			return None
 		else:
 			raise RuntimeError('Edge not on path')
-		return s.find_min()
+		return forest.find_min(s)
 
 	while True:
-		v = s.find_root()
-		if v is t:
+		v = forest.find_root(s)
+		if v == t:
 			# Update: send flow
-			v = s.find_min()
-			d = v.find_cost()
-			s.add_cost(-d)
+			augments += 1
+			v = forest.find_min(s)
+			d = forest.find_cost(v)
+			forest.add_cost(s, -d)
 
 			# Trim saturated branches
-			v = s.find_min()
-			v = remove_saturated_edge(v)
-			while v.find_cost() == 0:
+			v = remove_saturated_edge(forest.find_min(s))
+			while v is not None and forest.find_cost(v) == 0:
 				v = remove_saturated_edge(v)
-		elif (vw := find_edge(v.label)):
+		elif (e := find_edge(v)) >= 0:
 			# Advance: extend tree
-			w = vw[0]
-			d = vw[1]
-			v.add_cost(d)
-			v.link(forest[w])
-		elif v is not s:
+			advances += 1
+			vw = exits[v][e - first[v]]
+			forest.add_cost(v, vw[1])
+			forest.link(v, vw[0])
+			linked[v] = e
+		elif v != s:
 			# Retreat: trim tree
-			while len(entrances[v.label]):
-				u_i = entrances[v.label][-1]
-				u = forest[u_i]
-				uu = u.next_in_path
-				if v is uu:
-					d = u.find_cost()
-					u.cut()
-					u.add_cost(-d)
-					remove_edge(u, v, d)
+			retreats += 1
+			for e in into[v]:
+				if dead[e]:
+					continue
+				u = tails[e]
+				if linked[u] == e:
+					d = forest.find_cost(u)
+					forest.cut(u)
+					forest.add_cost(u, -d)
+					remove_edge(e, d)
 				else:
-					remove_edge(u, v)
+					remove_edge(e)
+			into[v].clear()
 		else:
 			break
 
-	for u in forest:
-		v = u.next_in_path
-		if is_node(v):
-			remove_edge(u, v, u.find_cost())
-			u.cut()
+	for u in range(n):
+		if forest.next_in_path(u) is not None:
+			remove_edge(linked[u], forest.find_cost(u))
+			forest.cut(u)
+
+	if stats is not None:
+		stats.counters['advance'] += advances
+		stats.counters['augment'] += augments
+		stats.counters['retreat'] += retreats
@@ -0,0 +1,96 @@
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+from max_flow.CSRGraph import CSRGraph
+from max_flow.PathTreeRework import PathTreeForest
+from max_flow.TerminalOverlay import TerminalOverlay, overlay_flow_graph
+from max_flow.rework import ForestFactory, find_sparse_max_flow
+
+Query = Tuple[Sequence[int], Sequence[int]] # (sources, sinks)
+Layout = Tuple[str, int, int] # (shared memory name, n, m)
+
+def solve_many(
+		C: Union[List[List[int]], CSRGraph],
+		queries: Iterable[Query],
+		processes: Optional[int] = None,
+		make_forest: ForestFactory = PathTreeForest
+	) -> Iterator[Tuple[int, int]]:
+	"""
+	Solves many (sources, sinks) maximum flow queries against one network.
+
+	The network is converted once into a CSR graph, and each query with
+	several sources or sinks is wired to them through its own
+	TerminalOverlay. With processes set, the graph is placed in shared
+	memory that workers attach to once, and results are yielded as (query
+	index, flow) pairs as soon as they finish, in no particular order.
+	Capacities must fit in 64 bits.
+	"""
+	G = _growable(C) if isinstance(C, CSRGraph) else CSRGraph.from_matrix(C)
+	if processes is None:
+		for (i, (sources, sinks)) in enumerate(queries):
+			yield (i, _solve_query(G, sources, sinks, make_forest))
+		return
+
+	n = len(G)
+	m = len(G.heads)
+	block = shared_memory.SharedMemory(create=True, size=8 * max(1, n + 1 + 3 * m))
+	try:
+		view = block.buf.cast('q')
+		view[:n + 1] = array('q', G.offsets)
+		view[n + 1:n + 1 + m] = array('q', G.heads)
+		view[n + 1 + m:n + 1 + 2 * m] = array('q', G.pair)
+		view[n + 1 + 2 * m:n + 1 + 3 * m] = array('q', G.capacity)
+		view.release()
+		del G
+
+		layout = (block.name, n, m)
+		with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(layout, make_forest)) as pool:
+			futures = {pool.submit(_solve_shared, sources, sinks): i for (i, (sources, sinks)) in enumerate(queries)}
+			for future in as_completed(futures):
+				yield (futures[future], future.result())
+	finally:
+		block.close()
+		block.unlink()
+
+def _growable(G: CSRGraph) -> CSRGraph:
+	"""Copies G's arc arrays into ones a TerminalOverlay can append to."""
+	return CSRGraph.from_arrays(G.offsets, array('q', G.heads), array('q', G.pair), list(G.capacity))
+
+def _solve_query(G: CSRGraph, sources: Sequence[int], sinks: Sequence[int], make_forest: ForestFactory) -> int:
+	"""
+	Solves one query on G from fresh residuals. Several terminals are wired
+	in through a TerminalOverlay, detached again once the query is solved.
+	"""
+	G.residual = list(G.capacity)
+	(s, t, O) = overlay_flow_graph(list(sources), list(sinks), G)
+	flow = find_sparse_max_flow(s, t, O, make_forest)
+	if isinstance(O, TerminalOverlay):
+		O.detach()
+	return flow
+
+""" WORKER STATE """
+_block: Optional[shared_memory.SharedMemory] = None
+_graph: Optional[CSRGraph] = None
+_make_forest: ForestFactory = PathTreeForest
+
+def _init_worker(layout: Layout, make_forest: ForestFactory) -> None:
+	"""Attaches to the shared graph once per process."""
+	global _block, _graph, _make_forest
+	(name, n, m) = layout
+	_block = shared_memory.SharedMemory(name=name)
+	view = _block.buf.cast('q')
+	_graph = CSRGraph.from_arrays(
+		view[:n + 1],
+		view[n + 1:n + 1 + m],
+		view[n + 1 + m:n + 1 + 2 * m],
+		view[n + 1 + 2 * m:n + 1 + 3 * m]
+	)
+	_make_forest = make_forest
+
+def _solve_shared(sources: Sequence[int], sinks: Sequence[int]) -> int:
+	G = _graph
+	if len(sources) > 1 or len(sinks) > 1:
+		# The shared arc arrays are fixed buffers, so overlays need copies
+		G = _growable(G)
+	return _solve_query(G, sources, sinks, _make_forest)
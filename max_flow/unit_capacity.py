@@ -0,0 +1,277 @@
+from collections import deque
+from itertools import chain
+from typing import Deque, List, Optional, Set, Tuple, Union
+from max_flow.CSRGraph import CSRGraph
+
+# (left, right) pairs of a bipartite matching
+Matching = List[Tuple[int, int]]
+# (left nodes, right nodes, arc joining each node to its terminal)
+Bipartition = Tuple[List[int], List[int], List[int]]
+# (flow, source side, saturated edges crossing the cut)
+FlowWithCut = Tuple[int, Set[int], List[Tuple[int, int]]]
+
+LEFT = 1
+RIGHT = 2
+
+def is_unit_capacity(C: Union[List[List[int]], CSRGraph]) -> bool:
+	"""Checks whether every capacity of a network is 0 or 1."""
+	capacities = C.capacity if isinstance(C, CSRGraph) else chain.from_iterable(C)
+	return all((0 <= c <= 1 for c in capacities))
+
+def find_bipartition(s: int, t: int, G: CSRGraph) -> Optional[Bipartition]:
+	"""
+	Splits a unit capacity network into the two sides of a matching problem,
+	or returns None if it is not one.
+
+	Every capacitated arc must run from s to the left, from the left to the
+	right or from the right to t, and each left (right) node must have
+	exactly one arc from s (to t).
+	"""
+	n = len(G)
+	heads = G.heads
+	pair = G.pair
+	capacity = G.capacity
+	side = [0] * n
+	terminal_arc = [-1] * n
+	for a in G.arcs(s):
+		if capacity[a]:
+			u = heads[a]
+			if u == t or side[u]:
+				return None
+			side[u] = LEFT
+			terminal_arc[u] = a
+	for a in G.arcs(t):
+		b = pair[a]
+		if capacity[b]:
+			v = heads[a]
+			if v == s or side[v]:
+				return None
+			side[v] = RIGHT
+			terminal_arc[v] = b
+	for u in range(n):
+		if u == s:
+			continue
+		for a in G.arcs(u):
+			v = heads[a]
+			if capacity[a] and v != t and (side[u] != LEFT or side[v] != RIGHT):
+				return None
+
+	left = [u for u in range(n) if side[u] == LEFT]
+	right = [v for v in range(n) if side[v] == RIGHT]
+	return (left, right, terminal_arc)
+
+def hopcroft_karp(G: CSRGraph, bipartition: Bipartition) -> Matching:
+	"""
+	Maximum matching of a bipartite unit network by Hopcroft–Karp, written
+	back to G's residuals as the corresponding flow.
+
+	Starts from the matching already carried by G's flow. Each phase finds the
+	shortest augmenting paths from the free left nodes by breadth first search
+	and augments along a maximal set of them with current-arc searches, so
+	O(√n) phases of O(m) each suffice.
+	"""
+	(left, right, terminal_arc) = bipartition
+	n = len(G)
+	heads = G.heads
+	pair = G.pair
+	capacity = G.capacity
+	R = G.residual
+	adjacency = [G.arcs(u) for u in range(n)]
+	mate = [-1] * n # Matched arc of each left node
+	matched_to = [-1] * n # Left node matched to each right node
+	for u in left:
+		for a in adjacency[u]:
+			if capacity[a] and R[a] == 0:
+				mate[u] = a
+				matched_to[heads[a]] = u
+				break
+
+	unreached = n
+	dist = [unreached] * n
+	current = [0] * n # Position of each node's current arc in its adjacency
+	while True:
+		# Layer the left nodes by alternating path length from a free one
+		queue: Deque[int] = deque()
+		for u in left:
+			if mate[u] == -1:
+				dist[u] = 0
+				queue.append(u)
+			else:
+				dist[u] = unreached
+		found = False
+		while len(queue) > 0:
+			u = queue.popleft()
+			for a in adjacency[u]:
+				if capacity[a]:
+					w = matched_to[heads[a]]
+					if w == -1:
+						found = True
+					elif dist[w] == unreached:
+						dist[w] = dist[u] + 1
+						queue.append(w)
+		if not found:
+			break
+
+		# Augment along vertex-disjoint shortest paths
+		for u in left:
+			current[u] = 0
+		for root in left:
+			if mate[root] != -1:
+				continue
+			path: List[int] = [] # Arcs taken from each left node on the path
+			u = root
+			while True:
+				arcs = adjacency[u]
+				end = len(arcs)
+				i = current[u]
+				w = -2
+				while i < end:
+					a = arcs[i]
+					if capacity[a]:
+						w = matched_to[heads[a]]
+						if w == -1 or dist[w] == dist[u] + 1:
+							break
+					i += 1
+				current[u] = i
+				if i == end:
+					# Dead end: drop u from this phase and back up
+					dist[u] = unreached
+					if len(path) == 0:
+						break
+					a = path.pop()
+					u = heads[pair[a]]
+					current[u] += 1
+					continue
+
+				path.append(a)
+				if w == -1:
+					for a in path:
+						mate[heads[pair[a]]] = a
+						matched_to[heads[a]] = heads[pair[a]]
+					break
+				u = w
+
+	# Write the matching back as flow
+	for u in left:
+		for a in adjacency[u]:
+			if capacity[a]:
+				f = int(mate[u] == a)
+				R[a] = capacity[a] - f
+				R[pair[a]] = f
+	for (nodes, matched) in ((left, mate), (right, matched_to)):
+		for u in nodes:
+			a = terminal_arc[u]
+			f = int(matched[u] != -1)
+			R[a] = capacity[a] - f
+			R[pair[a]] = f
+
+	return [(u, heads[mate[u]]) for u in left if mate[u] != -1]
+
+def send_unit_flow(s: int, t: int, G: CSRGraph) -> None:
+	"""
+	Dinic's algorithm for unit capacity networks, solving G in place.
+
+	Every arc saturates on the path that uses it, so each blocking flow is a
+	plain depth first search with current arcs and no dynamic trees, and
+	O(min(√m, n^(2/3))) phases suffice. Arcs are only enumerated through
+	G.arcs, so a TerminalOverlay's virtual arcs are followed too.
+	"""
+	n = len(G)
+	heads = G.heads
+	pair = G.pair
+	R = G.residual
+	adjacency = [G.arcs(u) for u in range(n)]
+	while True:
+		# Construct the level graph, stopping once the sink's level is reached
+		level = [-1] * n
+		level[s] = 0
+		queue: Deque[int] = deque([s])
+		while len(queue) > 0:
+			u = queue.popleft()
+			if level[t] != -1 and level[u] >= level[t]:
+				break
+			for a in adjacency[u]:
+				if R[a] and level[heads[a]] == -1:
+					level[heads[a]] = level[u] + 1
+					queue.append(heads[a])
+		if level[t] == -1:
+			return
+
+		# Send a blocking flow along it
+		current = [0] * n # Position of each node's current arc in its adjacency
+		path: List[int] = []
+		u = s
+		while True:
+			if u == t:
+				d = min((R[a] for a in path))
+				for a in path:
+					R[a] -= d
+					R[pair[a]] += d
+				k = next((i for (i, a) in enumerate(path) if R[a] == 0))
+				del path[k:]
+				u = heads[path[-1]] if len(path) > 0 else s
+				continue
+
+			arcs = adjacency[u]
+			end = len(arcs)
+			i = current[u]
+			while i < end and not (R[arcs[i]] and level[heads[arcs[i]]] == level[u] + 1):
+				i += 1
+			current[u] = i
+			if i < end:
+				a = arcs[i]
+				path.append(a)
+				u = heads[a]
+			elif u == s:
+				break
+			else:
+				# Retreat: u is a dead end for this phase
+				level[u] = -1
+				a = path.pop()
+				u = heads[pair[a]]
+				current[u] += 1
+
+def find_unit_max_flow(
+		s: int,
+		t: int,
+		C: Union[List[List[int]], CSRGraph],
+		cut: bool = False
+	) -> Tuple[Union[int, FlowWithCut], Optional[Matching]]:
+	"""
+	Find the maximum flow in a unit capacity network, along with a maximum
+	matching when the network is a bipartite matching problem.
+
+	The flow takes the same form as rework.find_max_flow's. Bipartite networks
+	are solved by Hopcroft–Karp and others by unit capacity Dinic's, in place
+	for CSR graphs.
+	"""
+	G = C if isinstance(C, CSRGraph) else CSRGraph.from_matrix(C)
+	bipartition = find_bipartition(s, t, G)
+	if bipartition is not None:
+		matching: Optional[Matching] = hopcroft_karp(G, bipartition)
+	else:
+		send_unit_flow(s, t, G)
+		matching = None
+
+	# Net flow out of the source
+	flow = sum((G.flow(a) for a in G.arcs(s)))
+	if not cut:
+		return (flow, matching)
+
+	# The nodes still reachable from the source form the source side
+	source_side = {s}
+	queue: Deque[int] = deque([s])
+	while len(queue) > 0:
+		u = queue.popleft()
+		for a in G.arcs(u):
+			v = G.heads[a]
+			if G.residual[a] and v not in source_side:
+				source_side.add(v)
+				queue.append(v)
+	cut_edges = [
+		(u, G.heads[a])
+		for u in source_side
+		for a in G.arcs(u)
+		if G.capacity[a] and G.heads[a] not in source_side
+	]
+	return ((flow, source_side, cut_edges), matching)
@@ -0,0 +1,64 @@
+from typing import List, Union
+import numpy as np
+from max_flow.PathTreeRework import PathTreeForest
+from max_flow.rework import FlowWithCut, ForestFactory, LevelGraph, expand_dense_level, send_blocking_flow
+
+def find_max_flow(
+		s: int,
+		t: int,
+		C: Union[List[List[int]], np.ndarray],
+		make_forest: ForestFactory = PathTreeForest,
+		cut: bool = False
+	) -> Union[int, FlowWithCut]:
+	"""
+	Find the maximum flow in a dense network, building each level graph with
+	rework.expand_dense_level, one array operation per row of each frontier.
+
+	Takes the same arguments and returns the same results as
+	rework.find_max_flow.
+	"""
+	C = np.array(C, dtype=np.int64)
+	R = C.copy() # Residual capacity matrix
+	n = len(C)
+
+	exits: LevelGraph = [[] for i in range(n)]
+	level_of = np.full(n, -1, dtype=np.int64)
+	level_of[s] = 0
+	frontier = [s]
+	ii = 1 # Next level
+
+	def update_edge(u: int, uv, d: int) -> None:
+		"""Update the flow along an edge."""
+		v = uv[0]
+		if uv[2]:
+			# Edge traverses backwards
+			R[v, u] = C[v, u] - d
+		else:
+			R[u, v] = d
+
+	while len(frontier) > 0:
+		frontier = expand_dense_level(frontier, level_of, ii, C, R, exits)
+
+		if level_of[t] == ii:
+			# Solve the level graph by sending a blocking flow along it
+			send_blocking_flow(s, t, exits, update_edge, make_forest)
+
+			# Reset the level graph
+			for exit in exits:
+				exit.clear()
+			level_of.fill(-1)
+			level_of[s] = 0
+			frontier = [s]
+			ii = 1
+		else:
+			ii += 1
+
+	flow = int((C[s] - R[s]).sum())
+	if not cut:
+		return flow
+
+	# The failed level graph construction reached exactly the source side
+	reached = level_of >= 0
+	(tails, heads) = np.nonzero((C > 0) & reached[:, None] & ~reached[None, :])
+	source_side = set(np.nonzero(reached)[0].tolist())
+	return (flow, source_side, list(zip(tails.tolist(), heads.tolist())))
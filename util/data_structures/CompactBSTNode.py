@@ -0,0 +1,46 @@
+from typing import List, Optional, TypeVar
+
+S = TypeVar('S', bound='CompactBSTNode')
+
+class CompactBSTNode:
+	"""
+	BSTNode with slots, a direct parent reference and None for missing nodes.
+
+	Keeps BSTNode's interface, except that absent parents and children read
+	as None rather than NULL.
+	"""
+	__slots__ = ('parent', 'left', 'right')
+
+	def __init__(self) -> None:
+		self.parent: Optional[CompactBSTNode] = None
+		self.left: Optional[CompactBSTNode] = None
+		self.right: Optional[CompactBSTNode] = None
+
+	@property
+	def children(self: S) -> List[Optional[S]]:
+		return [self.left, self.right]
+
+	def is_on(self, side: bool) -> bool:
+		parent = self.parent
+		if parent is None:
+			return False
+		return self is (parent.right if side else parent.left)
+
+	def swap(self: S, side: bool, child: Optional[S]) -> Optional[S]:
+		if side:
+			old = self.right
+			self.right = child
+		else:
+			old = self.left
+			self.left = child
+		if old is not None:
+			old.parent = None
+		if child is not None:
+			child.parent = self
+		return old
+
+	def give(self: S, side: bool) -> Optional[S]:
+		return self.swap(side, None)
+
+	def drop(self, side: bool) -> None:
+		self.give(side)
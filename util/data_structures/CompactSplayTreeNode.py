@@ -0,0 +1,35 @@
+from typing import Generic, Optional, Tuple, TypeVar
+from util.constants import RIGHT
+from util.data_structures.CompactBSTNode import CompactBSTNode
+
+T = TypeVar('T')
+S = TypeVar('S', bound='CompactSplayTreeNode')
+
+class CompactSplayTreeNode(CompactBSTNode, Generic[T]):
+	"""SplayTreeNode on CompactBSTNode: slots, direct references and None."""
+	__slots__ = ('value',)
+
+	def __init__(self, value: T) -> None:
+		super().__init__()
+		self.value = value
+
+	@property
+	def side(self): return self.is_on(RIGHT)
+
+	def rotate(self: S, lookAhead: Optional[Tuple[Optional[S], bool]] = None) -> Optional[Tuple[Optional[S], bool]]:
+		if lookAhead:
+			(parent, side) = lookAhead
+		else:
+			parent = self.parent
+			side = parent is not None and self is parent.right
+
+		if parent is not None:
+			side_0 = not side
+			save_child = self.give(side_0)
+			parent.swap(side, save_child)
+			grand_parent = parent.parent
+			grand_side = grand_parent is not None and parent is grand_parent.right
+			if grand_parent is not None:
+				grand_parent.swap(grand_side, self)
+			self.swap(side_0, parent)
+			return (grand_parent, grand_side)
@@ -10,4 +10,18 @@ while is_node(t.root):
 	t.delete(value)
 
 print('SplayTree:')
-print('    Supports insert, delete, access, and join: %s' % '✅' if values == [0, 5, 15, 20, 50] else '❌')
+print('    Supports insert, delete, access, and join: %s' % ('✅' if values == [0, 5, 15, 20, 50] else '❌'))
+
+from ..CompactSplayTreeNode import CompactSplayTreeNode
+
+root = CompactSplayTreeNode(20)
+root.swap(False, CompactSplayTreeNode(10))
+root.swap(True, CompactSplayTreeNode(30))
+root.left.swap(True, CompactSplayTreeNode(15))
+node = root.left.right
+lookAhead = node.rotate()
+while (lookAhead := node.rotate(lookAhead)):
+	pass
+result = (node.parent, node.left.value, node.right.value, node.left.right, node.right.left, node.right.right.value)
+print('CompactSplayTreeNode:')
+print('    Supports rotation to root: %s' % ('✅' if result == (None, 10, 20, None, None, 30) else '❌'))